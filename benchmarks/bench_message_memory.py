@@ -0,0 +1,49 @@
+"""Sözlük tabanlı mesajlarla Message/Chat nesnelerinin bellek kullanımı karşılaştırması.
+
+Kullanım: python benchmarks/bench_message_memory.py [mesaj_sayısı]
+"""
+import os
+import sys
+import gc
+import json
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage.models import Chat
+from bench_serializers import make_state
+
+
+def measure(build):
+    """build'in döndürdüğü yapının kapladığı belleği (bayt) ölçer"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    data = build()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used, data
+
+
+def main():
+    message_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    # Üç ölçüm de aynı JSON'dan çözülür; fark yalnızca mesaj yapısından gelir
+    encoded = json.dumps(make_state(message_count)["chat_data"])
+
+    text_bytes, _ = measure(lambda: [m["message"] for c in json.loads(encoded).values() for m in c["messages"]])
+    dict_bytes, _ = measure(lambda: json.loads(encoded))
+    model_bytes, _ = measure(
+        lambda: {chat_id: Chat.from_dict(chat) for chat_id, chat in json.loads(encoded).items()}
+    )
+
+    print(f"{message_count} mesaj (yalnızca metinler: {text_bytes / 1e6:.1f} MB)\n")
+    print(f"{'Yapı':<22}{'Toplam (MB)':>12}{'Mesaj başı ek yük (B)':>24}")
+    for name, used in (("dict", dict_bytes), ("Message/Chat", model_bytes)):
+        overhead = (used - text_bytes) / message_count
+        print(f"{name:<22}{used / 1e6:>12.1f}{overhead:>24.0f}")
+    print(f"\nMesaj başı ek yük azalması: %{(1 - (model_bytes - text_bytes) / (dict_bytes - text_bytes)) * 100:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Kayıt biçimlerinin kodlama/çözme süresi ve dosya boyutu karşılaştırması.
+
+Kullanım: python benchmarks/bench_serializers.py [mesaj_sayısı]
+"""
+import os
+import sys
+import json
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage.serializers import get_serializer, available_serializers
+
+MESSAGES_PER_CHAT = 100
+REPEAT = 3
+
+
+def make_state(message_count, seed=42):
+    """save_app_state biçiminde, rastgele metinli sentetik bir durum üretir"""
+    rng = random.Random(seed)
+    words = ["merhaba", "model", "yanıt", "proje", "dosya", "kod", "deepseek", "örnek", "şöyle", "çıktı"]
+    chat_data = {}
+    chats = []
+    for c in range(max(1, message_count // MESSAGES_PER_CHAT)):
+        chat_id = f"chat-{c:06d}"
+        messages = []
+        for m in range(MESSAGES_PER_CHAT):
+            text = " ".join(rng.choice(words) for _ in range(rng.randint(5, 80)))
+            messages.append({
+                "sender": "user" if m % 2 == 0 else "assistant",
+                "message": text,
+                "timestamp": f"2024-05-{1 + m % 28:02d}T12:{m % 60:02d}:00"
+            })
+        chat_data[chat_id] = {"title": f"Sohbet {c}", "messages": messages}
+        chats.append({"title": f"Sohbet {c}", "id": chat_id})
+    return {"version": "1.0.1", "chats": chats, "projects": [], "chat_data": chat_data}
+
+
+class IndentedJson:
+    """Eski kayıt biçimi: json, indent=2"""
+
+    name = "json (indent=2)"
+
+    def dumps(self, obj):
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+def best_of(func):
+    best = float("inf")
+    result = None
+    for _ in range(REPEAT):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    message_count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    state = make_state(message_count)
+    print(f"Sentetik durum: {len(state['chat_data'])} sohbet, {message_count} mesaj\n")
+    print(f"{'Biçim':<18}{'Kodlama (ms)':>14}{'Çözme (ms)':>14}{'Boyut (MB)':>12}")
+
+    serializers = [IndentedJson()] + [get_serializer(name) for name in available_serializers()]
+    for serializer in serializers:
+        encode_time, data = best_of(lambda: serializer.dumps(state))
+        decode_time, decoded = best_of(lambda: serializer.loads(data))
+        assert decoded == state, f"{serializer.name} kayıpsız değil"
+        print(f"{serializer.name:<18}{encode_time * 1000:>14.1f}{decode_time * 1000:>14.1f}{len(data) / 1e6:>12.2f}")
+
+    if "msgpack" not in available_serializers():
+        print("\nmsgpack kurulu değil; karşılaştırmaya eklemek için: pip install msgpack")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import math
+import logging
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:  # Tam tokenizer isteğe bağlıdır, yoksa tahmin kullanılır
+    tiktoken = None
+
+logger = logging.getLogger('DeepSeekChat.context_window')
+
+# OpenRouter model ID'lerine göre bağlam pencereleri (token)
+MODEL_CONTEXT_WINDOWS = {
+    "deepseek/deepseek-r1:free": 128000,
+    "deepseek/deepseek-coder:33b": 16000,
+    "deepseek/deepseek-math:7b": 4096,
+}
+DEFAULT_CONTEXT_WINDOW = 8192
+
+# Her mesajın rol ve ayraçları için eklenen sabit token payı
+MESSAGE_OVERHEAD = 4
+# Tokenizer tahmin hatalarına karşı bırakılan pay
+SAFETY_MARGIN = 0.05
+# Yanıt için istenen en fazla token; küçük pencerelerde pencerenin bu oranıyla sınırlanır
+MAX_REPLY_TOKENS = 4096
+MAX_REPLY_SHARE = 0.25
+
+_encoding = tiktoken.get_encoding("cl100k_base") if tiktoken is not None else None
+
+
+@lru_cache(maxsize=8192)
+def count_tokens(text):
+    """Metnin token sayısı; aynı metin için sonuç önbellekten gelir"""
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    # Yaklaşık 4 karakter = 1 token
+    return math.ceil(len(text) / 4)
+
+
+def message_tokens(message):
+    """Tek bir API mesajının token maliyeti"""
+    return count_tokens(message.get("content") or "") + MESSAGE_OVERHEAD
+
+
+def max_reply_tokens(model):
+    """Model için istenecek yanıt token sayısı (max_tokens)"""
+    window = MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+    return min(MAX_REPLY_TOKENS, int(window * MAX_REPLY_SHARE))
+
+
+def context_budget(model, reply_tokens):
+    """Model için istek mesajlarına ayrılabilecek token bütçesi"""
+    window = MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+    return max(0, int(window * (1 - SAFETY_MARGIN)) - reply_tokens)
+
+
+def fit_to_context(messages, model, reply_tokens=None):
+    """Mesajları bütçeye sığdırır: önce sistem/proje talimatları, sonra en yeni turlar.
+
+    (sığan mesajlar, dışarıda kalan mesaj sayısı, kullanılan token) döndürür.
+    """
+    if reply_tokens is None:
+        reply_tokens = max_reply_tokens(model)
+    budget = context_budget(model, reply_tokens)
+    pinned = [m for m in messages if m.get("role") == "system"]
+    used = sum(message_tokens(m) for m in pinned)
+
+    recent = []
+    for message in reversed([m for m in messages if m.get("role") != "system"]):
+        cost = message_tokens(message)
+        # Son mesaj bütçeyi aşsa bile gönderilir, aksi halde istek anlamsızlaşır
+        if recent and used + cost > budget:
+            break
+        recent.append(message)
+        used += cost
+    recent.reverse()
+
+    dropped = len(messages) - len(pinned) - len(recent)
+    if dropped:
+        logger.info(f"Bağlam kırpıldı ({model}): {dropped} mesaj dışarıda, {used}/{budget} token")
+    return pinned + recent, dropped, used
@@ -0,0 +1,119 @@
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import httpx
+except ImportError:  # HTTP/2 isteğe bağlıdır
+    httpx = None
+
+logger = logging.getLogger('DeepSeekChat.http_client')
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+DEFAULT_POOL_SIZE = 10
+
+TRANSPORT_ERRORS = (requests.exceptions.RequestException,)
+if httpx is not None:
+    TRANSPORT_ERRORS += (httpx.HTTPError,)
+
+
+class _Http2Response:
+    """httpx yanıtını requests.Response arayüzüne benzetir"""
+
+    def __init__(self, response):
+        self._response = response
+        self.status_code = response.status_code
+        self.headers = response.headers
+
+    @property
+    def text(self):
+        self._response.read()
+        return self._response.text
+
+    def json(self):
+        self._response.read()
+        return self._response.json()
+
+    def iter_lines(self, decode_unicode=True):
+        return self._response.iter_lines()
+
+    def close(self):
+        self._response.close()
+
+
+class HttpClient:
+    """OpenRouter trafiği için keep-alive bağlantı havuzlu ortak istemci"""
+
+    def __init__(self, pool_size=DEFAULT_POOL_SIZE, http2=False):
+        self.pool_size = pool_size
+        self.http2 = False
+        self._client = None
+
+        if http2:
+            if httpx is None:
+                logger.warning("HTTP/2 için httpx kurulu değil, HTTP/1.1 kullanılacak")
+            else:
+                try:
+                    limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+                    self._client = httpx.Client(http2=True, limits=limits)
+                    self.http2 = True
+                except ImportError:
+                    logger.warning("HTTP/2 için h2 paketi kurulu değil, HTTP/1.1 kullanılacak")
+
+        if self._client is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            self._client = session
+
+        logger.info(f"HTTP istemcisi hazır (havuz: {pool_size}, HTTP/2: {self.http2})")
+
+    def post(self, url, json=None, headers=None, timeout=120, stream=False):
+        """Havuzdaki bir bağlantı üzerinden POST isteği gönderir"""
+        if self.http2:
+            request = self._client.build_request("POST", url, json=json, headers=headers, timeout=timeout)
+            return _Http2Response(self._client.send(request, stream=stream))
+        return self._client.post(url, json=json, headers=headers, timeout=timeout, stream=stream)
+
+    def prewarm(self, url=OPENROUTER_BASE_URL):
+        """DNS, TCP ve TLS el sıkışmasını arka planda önceden yapar"""
+        def warm():
+            try:
+                self._client.head(url, timeout=10)
+                logger.info(f"Bağlantı önceden ısıtıldı: {url}")
+            except TRANSPORT_ERRORS as e:
+                logger.warning(f"Bağlantı önceden ısıtılamadı: {str(e)}")
+
+        thread = threading.Thread(target=warm, name="http-prewarm", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        """Havuzdaki tüm bağlantıları kapatır"""
+        self._client.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """Süreç genelinde paylaşılan HttpClient örneğini döndürür"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = HttpClient()
+        return _client
+
+
+def configure(pool_size=DEFAULT_POOL_SIZE, http2=False):
+    """Paylaşılan istemciyi verilen havuz boyutu ve protokolle yeniden oluşturur"""
+    global _client
+    with _client_lock:
+        old_client = _client
+        _client = HttpClient(pool_size=pool_size, http2=http2)
+    if old_client is not None:
+        old_client.close()
+    return _client
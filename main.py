@@ -3,7 +3,6 @@ import os
 import json
 import logging
 import uuid
-import requests
 import time
 import re
 from PyQt6.QtWidgets import (
@@ -13,17 +12,27 @@ from PyQt6.QtWidgets import (
     QMenu, QSystemTrayIcon, QInputDialog, QDialog, QDialogButtonBox,
     QFormLayout, QTabWidget, QFileDialog, QListWidgetItem, QGroupBox,
     QScrollArea, QKeySequenceEdit, QToolButton, QSizePolicy, QGridLayout,
-    QFontComboBox, QSlider, QMessageBox, QCheckBox, QListView, QAbstractScrollArea
+    QFontComboBox, QSlider, QMessageBox, QCheckBox, QListView, QAbstractScrollArea,
+    QAbstractItemView, QProgressDialog, QStackedWidget
 )
-from PyQt6.QtCore import Qt, QTimer, QSize, QDateTime, QEvent
+from PyQt6.QtCore import Qt, QTimer, QSize, QEvent
 from PyQt6.QtGui import (
-    QAction, QIcon, QKeySequence, QTextCursor, QColor, QTextCharFormat, QFont, QPixmap, QFontMetrics
+    QAction, QIcon, QKeySequence, QTextCursor, QColor, QTextCharFormat, QFont, QPixmap, QFontMetrics,
+    QTextFormat, QTextFrameFormat
 )
 
 from login_window import LoginWindow
 from user_manager import UserManager
 from worker_thread import WorkerThread
+from request_dispatcher import RequestDispatcher
+from response_cache import ResponseCache
+from storage import open_store, BackgroundSaver, ChatCache, ChatArchive, Chat, Message, Sender, MigrationError
+from storage.models import to_iso
+import http_client
 from project_view import ProjectView
+from transcript_view import TranscriptView, message_html, VIRTUALIZE_THRESHOLD
+from message_renderer import MessageRenderer, is_heavy
+from context_window import MODEL_CONTEXT_WINDOWS, DEFAULT_CONTEXT_WINDOW, count_tokens
 from utils.error_dialog import ErrorDialog
 from utils.font_manager import apply_font_settings
 from utils import validate_email, format_file_size, create_safe_filename
@@ -36,8 +45,24 @@ logging.basicConfig(
 )
 logger = logging.getLogger("DeepSeekChat")
 
+WELCOME_HTML = "<center><i>Merhaba, size nasıl yardımcı olabilirim?</i></center>"
+# Akış hatayla kesildiğinde kaydedilen yarım yanıtın sonuna eklenir
+INTERRUPTED_NOTE = "\n\n*[Yanıt yarıda kesildi]*"
+
+# Arka planda işlenen mesajın çerçevesinde, işlem bitince yeniden yazmak için saklanan alanlar
+PENDING_SENDER_PROPERTY = QTextFormat.Property.UserProperty.value + 1
+PENDING_TEXT_PROPERTY = QTextFormat.Property.UserProperty.value + 2
+
 class MainApplication(QMainWindow):
     VERSION = "1.0.1"
+    STORAGE_BACKEND = "sqlite"  # "sqlite", "journal" veya "sharded"
+    STORAGE_FORMAT = "auto"  # "auto", "json", "orjson" veya "msgpack"
+    SAVE_DEBOUNCE_MS = 250  # durum kayıtlarının birleştirildiği süre
+    ARCHIVE_AFTER_DAYS = 30  # bu kadar gün dokunulmayan sohbetler arşivlenir (0: kapalı)
+    RENDER_CHUNK = 50  # sohbet açılırken olay döngüsünün her turunda çizilen mesaj sayısı
+    STREAM_FRAME_MS = 16  # akış parçalarının ekrana en fazla bu aralıkla yazılması (~60 Hz)
+    HISTORY_PAGE = 200  # sohbet açılırken yüklenen son mesaj sayısı; eskiler yukarı kaydırdıkça gelir
+    SHUTDOWN_WAIT_MS = 5000  # çıkışta durdurulan her isteğin bitmesi için beklenen en uzun süre
     def __init__(self):
         """Ana uygulamanın arayüzünü ve ayarlarını hazırlar"""
         super().__init__()
@@ -113,9 +138,60 @@ class MainApplication(QMainWindow):
         # Ekli dosyalar
         self.attached_files = []
         self.project_context = {}
+        # Akış mesajının yeri: metin görünümünde imleç, sanal listede satır numarası
+        self.stream_text_cursor = None
+        self.stream_row = None
+        self.stream_pending = []
+        self.stream_timer = QTimer(self)
+        self.stream_timer.setSingleShot(True)
+        self.stream_timer.setInterval(self.STREAM_FRAME_MS)
+        self.stream_timer.timeout.connect(self.flush_stream)
+        self.render_generation = 0
+        self.transcript_busy = False
+        # Mesaj HTML'i önbellekten gelir, ağır Markdown arka planda işlenir
+        self.renderer = MessageRenderer(parent=self)
+        self.transcript_view.render_html = self.format_message
+        self.render_refresh_timer = QTimer(self)
+        self.render_refresh_timer.setSingleShot(True)
+        self.render_refresh_timer.setInterval(50)
+        self.render_refresh_timer.timeout.connect(self.refresh_transcript)
+        # İşlenmesi biten mesajlar toplanıp yalnızca kendi yerlerinde yeniden çizilir
+        self.rendered_keys = set()
+        self.rendered_timer = QTimer(self)
+        self.rendered_timer.setSingleShot(True)
+        self.rendered_timer.setInterval(50)
+        self.rendered_timer.timeout.connect(self.apply_rendered)
+        self.renderer.updated.connect(self.handle_rendered)
+        self.stream_buffers = {}
+        self.response_cache = None
+        self.dispatcher = RequestDispatcher(self)
+        self.dispatcher.pending_changed.connect(self.set_chat_pending)
+        self.dispatcher.pending_changed.connect(lambda *_: self.update_stop_button())
+        self.dispatcher.duplicate_dropped.connect(
+            lambda chat_id, total: self.statusBar().showMessage(
+                f"⚠️ Yanıt beklenirken gelen yinelenen istek birleştirildi (toplam {total})", 3000
+            )
+        )
+        self.dispatcher.request_blocked.connect(
+            lambda chat_id: self.statusBar().showMessage(
+                "⏳ Bu sohbette yanıt bekleniyor; mesajınız gönderilmedi", 3000
+            )
+        )
         
         # Uygulama durumunu yükle
+        self.store = self.open_chat_store()
+        # Yazmalar ayrı bir iş parçacığında birleştirilerek yapılır
+        self.saver = BackgroundSaver(self.store)
+        self.save_timer = QTimer(self)
+        self.save_timer.setSingleShot(True)
+        self.save_timer.setInterval(self.SAVE_DEBOUNCE_MS)
+        self.save_timer.timeout.connect(self.write_app_state)
+        self.archive = ChatArchive()
         self.load_app_state()
+        QTimer.singleShot(0, self.auto_archive_chats)
+        self.compaction_timer = QTimer(self)
+        self.compaction_timer.timeout.connect(lambda: self.saver.submit(self.store.compact))
+        self.compaction_timer.start(5 * 60 * 1000)
         self.apply_font_settings()
         
         # Tema
@@ -124,8 +200,11 @@ class MainApplication(QMainWindow):
         # Aktif sohbet ID'si
         self.active_chat_id = None
         self.api_key = None
-        self.api_base_url = "https://openrouter.ai/api/v1"
+        self.api_base_url = http_client.OPENROUTER_BASE_URL
         self.load_api_key()
+
+        # Ortak bağlantı havuzunu pencere açılırken ısıt
+        http_client.get_client().prewarm(self.api_base_url)
         
     # BU METODU EKLEYİN (init'den sonra herhangi bir yere)
     def apply_font_settings(self):
@@ -133,6 +212,8 @@ class MainApplication(QMainWindow):
         try:
             from utils.font_manager import apply_font_settings
             apply_font_settings(self)
+            if self.renderer.set_style(font_family=self.font_family, font_size=self.font_size):
+                self.render_refresh_timer.start()
         except Exception as e:
             logger.error(f"Font ayarları uygulanırken hata: {str(e)}")  
         
@@ -140,104 +221,177 @@ class MainApplication(QMainWindow):
         # UI kurulumu burada yapılır
         pass    
         
-    def load_app_state(self):
-        """Uygulama durumunu yükle"""
-        try:
-            self.chat_data = {}
-            if os.path.exists("app_state.json"):
-                with open("app_state.json", "r") as f:
-                    app_state = json.load(f)
-
-                    # Chat listesini yükle
-                    self.chat_list.clear()
-                    for chat in app_state.get("chats", []):
-                        item = QListWidgetItem(chat["title"])
-                        item.setData(Qt.ItemDataRole.UserRole, chat["id"])
-                        item.setFlags(item.flags() | Qt.ItemFlag.ItemIsEditable)
-                        item.setSizeHint(QSize(25, 4))
-                        self.chat_list.addItem(item)
-
-                        if "chat_data" in app_state and chat["id"] in app_state["chat_data"]:
-                            self.chat_data[chat["id"]] = app_state["chat_data"][chat["id"]]
-                            self.chat_list.setEditTriggers(QAbstractItemView.EditTrigger.DoubleClicked)
-                            self.chat_list.setSizeAdjustPolicy(QAbstractScrollArea.SizeAdjustPolicy.AdjustToContents)
-
-                    # Proje ağacını yükle
-                    self.projects_tree.clear()
-                    for project in app_state.get("projects", []):
-                        def load_tree_item(data, parent=None):
-                            item = QTreeWidgetItem([data["text"]])
-                            if data["id"]:
-                                item.setData(0, Qt.ItemDataRole.UserRole, data["id"])
+    def open_chat_store(self):
+        """Depoyu açar; eski JSON durumu varsa ilerleme göstererek aktarır"""
+        progress_dialog = None
 
-                            if "chat_data" in app_state and data["id"] in app_state["chat_data"]:
-                                self.chat_data[data["id"]] = app_state["chat_data"][data["id"]]
+        def report(done, total):
+            nonlocal progress_dialog
+            if progress_dialog is None:
+                progress_dialog = QProgressDialog("Eski sohbetler aktarılıyor...", None, 0, 100, self)
+                progress_dialog.setWindowTitle("Sohbet Aktarımı")
+                progress_dialog.setWindowModality(Qt.WindowModality.ApplicationModal)
+            progress_dialog.setValue(int(done * 100 / total) if total else 100)
+            QApplication.processEvents()
 
-                            for child_data in data.get("children", []):
-                                child_item = load_tree_item(child_data)
-                                item.addChild(child_item)
-                            return item
+        try:
+            return open_store(self.STORAGE_BACKEND, self.STORAGE_FORMAT, progress=report)
+        except MigrationError as e:
+            logger.error(f"Eski durum aktarılamadı: {str(e)}")
+            QMessageBox.warning(
+                self, "Aktarım Hatası",
+                f"Eski sohbetler aktarılamadı, dosyalar olduğu gibi bırakıldı:\n{str(e)}"
+            )
+            return open_store(self.STORAGE_BACKEND, self.STORAGE_FORMAT, migrate=False)
+        finally:
+            if progress_dialog is not None:
+                progress_dialog.close()
 
-                        item = load_tree_item(project)
-                        self.projects_tree.addTopLevelItem(item)
+    def load_app_state(self):
+        """Uygulama durumunu yükle"""
+        try:
+            # Açılışta yalnızca başlıklar okunur; mesajlar sohbet açılınca yüklenir
+            lazy = self.store.lazy_loading
+            self.chat_data = ChatCache(
+                self.load_chat_messages,
+                pager=self.load_chat_page if lazy else None,
+                page_size=self.HISTORY_PAGE,
+            )
+            if not lazy:
+                self.chat_data.capacity = None
+            app_state = self.store.load_state(messages=not lazy)
+            if app_state:
+                # Chat listesini yükle
+                self.chat_list.clear()
+                for chat in app_state.get("chats", []):
+                    item = QListWidgetItem(chat["title"])
+                    item.setData(Qt.ItemDataRole.UserRole, chat["id"])
+                    item.setFlags(item.flags() | Qt.ItemFlag.ItemIsEditable)
+                    item.setSizeHint(QSize(25, 4))
+                    self.chat_list.addItem(item)
+
+                    if "chat_data" in app_state and chat["id"] in app_state["chat_data"]:
+                        self.chat_data.add(chat["id"], app_state["chat_data"][chat["id"]])
+                        self.chat_list.setEditTriggers(QAbstractItemView.EditTrigger.DoubleClicked)
+                        self.chat_list.setSizeAdjustPolicy(QAbstractScrollArea.SizeAdjustPolicy.AdjustToContents)
+
+                # Proje ağacını yükle
+                self.projects_tree.clear()
+                for project in app_state.get("projects", []):
+                    def load_tree_item(data, parent=None):
+                        item = QTreeWidgetItem([data["text"]])
+                        if data["id"]:
+                            item.setData(0, Qt.ItemDataRole.UserRole, data["id"])
+
+                        if "chat_data" in app_state and data["id"] in app_state["chat_data"]:
+                            self.chat_data.add(data["id"], app_state["chat_data"][data["id"]])
+
+                        for child_data in data.get("children", []):
+                            child_item = load_tree_item(child_data)
+                            item.addChild(child_item)
+                        return item
+
+                    item = load_tree_item(project)
+                    self.projects_tree.addTopLevelItem(item)
+
+                # Arşivdeki sohbetler yalnızca başlıklarıyla yüklenir
+                self.archive_root.takeChildren()
+                for chat_id, title in self.archive.titles():
+                    self.chat_data.add(chat_id, {"title": title})
+                    self.archive_root.addChild(self.make_archive_item(chat_id, title))
+                self.update_archive_root()
+
+                # Modeli yükle
+                model = app_state.get("model", "deepseek-chat")
+                self.model_combo.setCurrentText(model)
+
+                # Temayı yükle
+                theme = app_state.get("theme", "dark")
+                self.apply_theme(theme)
+                self.current_theme = theme
+
+                # Font ayarları
+                self.font_family = app_state.get("font_family", "Arial")
+                self.font_size = app_state.get("font_size", 16)
+                self.label_bold = app_state.get("label_bold", True)
+                self.italic_subtitles = app_state.get("italic_subtitles", False)
+                self.apply_font_settings()
 
-                    # Modeli yükle
-                    model = app_state.get("model", "deepseek-chat")
-                    self.model_combo.setCurrentText(model)
-
-                    # Temayı yükle
-                    theme = app_state.get("theme", "dark")
-                    self.apply_theme(theme)
-                    self.current_theme = theme
-
-                    # Font ayarları
-                    self.font_family = app_state.get("font_family", "Arial")
-                    self.font_size = app_state.get("font_size", 16)
-                    self.label_bold = app_state.get("label_bold", True)
-                    self.italic_subtitles = app_state.get("italic_subtitles", False)
-                    self.apply_font_settings()
-
-                    # Proje bağlamı
-                    self.project_context = app_state.get("project_context", {})
-
-                    # Kısayollar
-                    shortcuts = app_state.get("shortcuts", {})
-                    self.send_action.setShortcut(QKeySequence(shortcuts.get("send", "Ctrl+Return")))
-                    self.newline_action.setShortcut(QKeySequence(shortcuts.get("newline", "Return")))
-                    self.fullscreen_action.setShortcut(QKeySequence(shortcuts.get("fullscreen", "F11")))
-                    self.minimize_action.setShortcut(QKeySequence(shortcuts.get("minimize", "Ctrl+M")))
-
-                    # Aktif sohbet
-                    self.active_chat_id = app_state.get("active_chat_id")
-                    if self.active_chat_id and self.active_chat_id in self.chat_data:
-                        found = False
-                        for i in range(self.chat_list.count()):
-                            item = self.chat_list.item(i)
-                            if item.data(Qt.ItemDataRole.UserRole) == self.active_chat_id:
-                                self.chat_list.setCurrentItem(item)
-                                self.load_chat(item)
-                                found = True
+                # Proje bağlamı (kayıtta proje sırasına göre tutulur)
+                self.project_context = {}
+                for position, ctx in app_state.get("project_context", {}).items():
+                    if str(position).isdigit() and int(position) < self.projects_tree.topLevelItemCount():
+                        self.project_context[id(self.projects_tree.topLevelItem(int(position)))] = ctx
+
+                # Yanıt önbelleği
+                self.response_cache_action.setChecked(app_state.get("response_cache", False))
+
+                # Kısayollar
+                shortcuts = app_state.get("shortcuts", {})
+                self.send_action.setShortcut(QKeySequence(shortcuts.get("send", "Ctrl+Return")))
+                self.newline_action.setShortcut(QKeySequence(shortcuts.get("newline", "Return")))
+                self.fullscreen_action.setShortcut(QKeySequence(shortcuts.get("fullscreen", "F11")))
+                self.minimize_action.setShortcut(QKeySequence(shortcuts.get("minimize", "Ctrl+M")))
+
+                # Aktif sohbet
+                self.active_chat_id = app_state.get("active_chat_id")
+                if self.active_chat_id and self.active_chat_id in self.chat_data:
+                    found = False
+                    for i in range(self.chat_list.count()):
+                        item = self.chat_list.item(i)
+                        if item.data(Qt.ItemDataRole.UserRole) == self.active_chat_id:
+                            self.chat_list.setCurrentItem(item)
+                            self.load_chat(item)
+                            found = True
+                            break
+
+                    if not found:
+                        def find_in_projects(item):
+                            for i in range(item.childCount()):
+                                child = item.child(i)
+                                if child.data(0, Qt.ItemDataRole.UserRole) == self.active_chat_id:
+                                    self.projects_tree.setCurrentItem(child)
+                                    self.load_project_chat(child, 0)
+                                    return True
+                            return False
+
+                        for i in range(self.projects_tree.topLevelItemCount()):
+                            if find_in_projects(self.projects_tree.topLevelItem(i)):
                                 break
 
-                        if not found:
-                            def find_in_projects(item):
-                                for i in range(item.childCount()):
-                                    child = item.child(i)
-                                    if child.data(0, Qt.ItemDataRole.UserRole) == self.active_chat_id:
-                                        self.projects_tree.setCurrentItem(child)
-                                        self.load_project_chat(child, 0)
-                                        return True
-                                return False
-
-                            for i in range(self.projects_tree.topLevelItemCount()):
-                                if find_in_projects(self.projects_tree.topLevelItem(i)):
-                                    break
-
         except Exception as e:
             logger.error(f"Durum yüklenirken hata: {str(e)}")
 
+    def load_chat_messages(self, chat_id):
+        """Bellekte olmayan bir sohbetin mesajlarını depodan okur"""
+        # Kuyruktaki yazmalar okumadan önce diske inmeli
+        self.saver.flush()
+        if chat_id in self.archive:
+            return self.archive.load(chat_id)
+        return self.store.load_chat(chat_id)
+
+    def load_chat_page(self, chat_id, before, limit):
+        """Sohbetin `before` sırasından önceki en fazla `limit` mesajını okur"""
+        self.saver.flush()
+        if chat_id in self.archive:
+            # Arşivdeki sohbet tek parça sıkıştırılmış olduğundan tamamı okunur
+            return 0, self.archive.load(chat_id)
+        return self.store.load_page(chat_id, before, limit)
+
+    def save_project_context(self):
+        """Seçili projenin talimatlarını proje bağlamına aktarır"""
+        current = self.projects_tree.currentItem()
+        if current and not current.parent():
+            ctx = self.project_context.setdefault(id(current), {"instructions": "", "files": []})
+            ctx["instructions"] = self.project_instructions.toPlainText()
+
     def save_app_state(self):
-        """Uygulama durumunu kaydet"""
+        """Durum kaydını erteler; kısa aralıklı çağrılar tek yazmada birleşir"""
+        self.save_timer.start()
+
+    def write_app_state(self):
+        """Sohbet listesi, proje ağacı ve ayarları arka plan kaydediciye gönder"""
+        self.save_timer.stop()
         try:
             self.save_project_context()
             # Chat listesini kaydet
@@ -262,22 +416,26 @@ class MainApplication(QMainWindow):
                 return data
             
             projects = []
+            project_context = {}
             for i in range(self.projects_tree.topLevelItemCount()):
                 item = self.projects_tree.topLevelItem(i)
                 projects.append(save_tree_item(item))
+                if id(item) in self.project_context:
+                    ctx = self.project_context[id(item)]
+                    project_context[str(i)] = {"instructions": ctx.get("instructions", ""), "files": list(ctx.get("files", []))}
             
             app_state = {
                 "version": self.VERSION,
                 "chats": chat_items,
                 "projects": projects,
-                "chat_data": self.chat_data,
                 "model": self.model_combo.currentText(),
                 "theme": self.current_theme,
                 "font_family": self.font_family,
                 "font_size": self.font_size,
                 "label_bold": self.label_bold,
                 "italic_subtitles": self.italic_subtitles,
-                "project_context": self.project_context,
+                "project_context": project_context,
+                "response_cache": self.response_cache is not None,
                 "shortcuts": {
                     "send": self.send_action.shortcut().toString(),
                     "newline": self.newline_action.shortcut().toString(),
@@ -287,10 +445,9 @@ class MainApplication(QMainWindow):
                 "active_chat_id": self.active_chat_id
             }
             
-            with open("app_state.json", "w") as f:
-                json.dump(app_state, f, indent=2)
-                
-            logger.info("Uygulama durumu kaydedildi")
+            # Sohbet içerikleri mesaj düzeyinde ayrıca kaydedilir
+            self.saver.save_state(app_state)
+            logger.debug("Uygulama durumu kayıt kuyruğuna alındı")
         except Exception as e:
             logger.error(f"Uygulama durumu kaydedilirken hata: {str(e)}")    
         
@@ -382,6 +539,17 @@ class MainApplication(QMainWindow):
         self.projects_tree.dropEvent = self.project_drop_event
         self.projects_tree.currentItemChanged.connect(self.load_project_context)
         sidebar_layout.addWidget(self.projects_tree, 1)
+
+        # Arşiv
+        self.archive_tree = QTreeWidget()
+        self.archive_tree.setHeaderHidden(True)
+        self.archive_tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.archive_tree.customContextMenuRequested.connect(self.show_archive_context_menu)
+        self.archive_tree.itemClicked.connect(self.load_archived_chat)
+        self.archive_root = QTreeWidgetItem(["🗄️ Arşiv"])
+        self.archive_tree.addTopLevelItem(self.archive_root)
+        self.archive_tree.setMaximumHeight(120)
+        sidebar_layout.addWidget(self.archive_tree)
         
         # Model Seçimi
         model_box = QGroupBox("🤖 Model")
@@ -408,11 +576,20 @@ class MainApplication(QMainWindow):
         chat_layout = QVBoxLayout(chat_tab)
         self.chat_display = QTextEdit()
         self.chat_display.setReadOnly(True)
-        self.chat_display.setHtml("<center><i>Merhaba, size nasıl yardımcı olabilirim?</i></center>")
+        self.chat_display.setHtml(WELCOME_HTML)
         self.chat_display.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.chat_display.customContextMenuRequested.connect(self.show_chat_context_menu)
-        chat_layout.addWidget(self.chat_display)
+        # Uzun sohbetler yalnızca görünen mesajları çizen listede gösterilir
+        self.transcript_view = TranscriptView()
+        self.chat_stack = QStackedWidget()
+        self.chat_stack.addWidget(self.chat_display)
+        self.chat_stack.addWidget(self.transcript_view)
+        chat_layout.addWidget(self.chat_stack)
+        # En üste kaydırılınca sohbetin eski mesajları yüklenir
+        self.chat_display.verticalScrollBar().valueChanged.connect(self.maybe_load_older)
+        self.transcript_view.verticalScrollBar().valueChanged.connect(self.maybe_load_older)
         self.context_tabs.addTab(chat_tab, "💬 Sohbet")
+        self.context_tabs.currentChanged.connect(lambda _: QTimer.singleShot(0, self.maybe_load_older))
         
         # Proje Bağlamı Sekmesi
         project_tab = QWidget()
@@ -495,6 +672,14 @@ class MainApplication(QMainWindow):
         self.send_btn.clicked.connect(self.send_message)
         self.send_btn.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
         bottom_layout.addWidget(self.send_btn)
+        
+        # Durdur Butonu - yalnızca aktif sohbette bekleyen yanıt varken etkin
+        self.stop_btn = QPushButton("⏹ Durdur")
+        self.stop_btn.setToolTip("Yanıt oluşturmayı durdur")
+        self.stop_btn.clicked.connect(self.stop_generation)
+        self.stop_btn.setEnabled(False)
+        self.stop_btn.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
+        bottom_layout.addWidget(self.stop_btn)
         send_layout.addWidget(self.message_input)
         send_layout.addLayout(bottom_layout)
             
@@ -530,6 +715,13 @@ class MainApplication(QMainWindow):
         models_action.setIconVisibleInMenu(True)
         models_action.triggered.connect(self.open_model_management)
         settings_menu.addAction(models_action)
+        self.response_cache_action = QAction(QIcon("icons/update.png"), "⚡ Yanıt Önbelleği", self)
+        self.response_cache_action.setIconVisibleInMenu(True)
+        self.response_cache_action.setCheckable(True)
+        self.response_cache_action.setToolTip("Aynı istekleri önbellekten yanıtla (Shift+Gönder atlar)")
+        self.response_cache_action.toggled.connect(self.set_response_cache_enabled)
+        self.response_cache_action.triggered.connect(self.save_app_state)
+        settings_menu.addAction(self.response_cache_action)
         
         # Yardım Menüsü - Menü ikonları
         help_menu = menubar.addMenu("❓ Yardım")
@@ -921,16 +1113,12 @@ class MainApplication(QMainWindow):
         try:
             chat_id = item.data(Qt.ItemDataRole.UserRole)
             if chat_id not in self.chat_data:
-                self.chat_data[chat_id] = {
-                    "title": item.text(),
-                    "messages": []
-                }
+                self.chat_data[chat_id] = Chat(item.text(), [])
             
             # Mesajları yükle
-            self.chat_display.clear()
-            for msg in self.chat_data[chat_id]["messages"]:
-                self.append_message(msg["sender"], msg["message"])
+            self.show_transcript(self.chat_data[chat_id].messages)
             self.active_chat_id = chat_id
+            self.render_pending_stream(chat_id)
             self.statusBar().showMessage(f"💬 {item.text()} yüklendi", 3000)
             
             # Sidebar'da seçili hale getir
@@ -959,16 +1147,12 @@ class MainApplication(QMainWindow):
                     chat_id = str(uuid.uuid4())
                     item.setData(0, Qt.ItemDataRole.UserRole, chat_id)
                 if chat_id not in self.chat_data:
-                    self.chat_data[chat_id] = {
-                        "title": item.text(0),
-                        "messages": []
-                    }
+                    self.chat_data[chat_id] = Chat(item.text(0), [])
                 
                 # Mesajları yükle
-                self.chat_display.clear()
-                for msg in self.chat_data[chat_id]["messages"]:
-                    self.append_message(msg["sender"], msg["message"])
+                self.show_transcript(self.chat_data[chat_id].messages)
                 self.active_chat_id = chat_id
+                self.render_pending_stream(chat_id)
                 project_name = item.parent().text(0)
                 self.statusBar().showMessage(f"📂 {project_name} > {item.text(0)} yüklendi", 3000)
                 
@@ -1045,7 +1229,8 @@ class MainApplication(QMainWindow):
             # Boş "Yeni Sohbet" var mı kontrol et
             for i in range(self.chat_list.count()):
                 item = self.chat_list.item(i)
-                if item.text().startswith("Yeni Sohbet") and not self.chat_data.get(item.data(Qt.ItemDataRole.UserRole), {}).get("messages", []):
+                chat_id = item.data(Qt.ItemDataRole.UserRole)
+                if item.text().startswith("Yeni Sohbet") and not (chat_id in self.chat_data and self.chat_data[chat_id].messages):
                     self.chat_list.setCurrentItem(item)
                     self.load_chat(item)
                     self.statusBar().showMessage("📝 Mevcut yeni sohbet seçildi", 3000)
@@ -1061,17 +1246,16 @@ class MainApplication(QMainWindow):
             self.chat_list.addItem(item)
             
             # Yeni sohbet verisini oluştur
-            self.chat_data[chat_id] = {
-                "title": chat_name,
-                "messages": []
-            }
+            self.chat_data[chat_id] = Chat(chat_name, [])
+            self.saver.save_chat(chat_id, chat_name)
             
             # Son eklenen öğeyi seç
             self.chat_list.setCurrentItem(item)
             self.active_chat_id = chat_id
             
             # Sohbeti yükle
-            self.chat_display.setHtml("<center><i>Merhaba, size nasıl yardımcı olabilirim?</i></center>")
+            self.clear_transcript(WELCOME_HTML)
+            self.update_stop_button()
             self.statusBar().showMessage("🆕 Yeni sohbet başlatıldı", 3000)
             
             # Uygulama durumunu kaydet
@@ -1086,7 +1270,7 @@ class MainApplication(QMainWindow):
             chat_id = item.data(Qt.ItemDataRole.UserRole)
             if chat_id in self.chat_data:
                 # Düzenleme öncesi orijinal başlığı yükle
-                original_title = self.chat_data[chat_id]["title"]
+                original_title = self.chat_data.title(chat_id)
                 item.setText(original_title)
                 
             self.chat_list.editItem(item)
@@ -1139,9 +1323,10 @@ class MainApplication(QMainWindow):
         for i in range(self.projects_tree.topLevelItemCount()):
             update_tree(self.projects_tree.topLevelItem(i))
 
-        if chat_id in self.chat_data:
-            self.chat_data[chat_id]["title"] = new_title
-            self.save_app_state()  
+        if chat_id in self.chat_data and self.chat_data.title(chat_id) != new_title:
+            self.chat_data.set_title(chat_id, new_title)
+            self.saver.save_chat(chat_id, new_title)
+            self.save_app_state()
     def resizeEvent(self, event):
         """Pencere yeniden boyutlandırıldığında chat listesini güncelle"""
         super().resizeEvent(event)
@@ -1153,7 +1338,7 @@ class MainApplication(QMainWindow):
             item = self.chat_list.item(i)
             chat_id = item.data(Qt.ItemDataRole.UserRole)
             if chat_id in self.chat_data:
-                title = self.chat_data[chat_id]["title"]
+                title = self.chat_data.title(chat_id)
                 self.update_chat_title(chat_id, title)  
 
     def handle_chat_title_changed(self, item):
@@ -1190,7 +1375,7 @@ class MainApplication(QMainWindow):
                 new_project.setExpanded(True)
                 # Projeyi seç
                 self.projects_tree.setCurrentItem(new_project)
-                self.chat_display.setHtml("<center><i>Merhaba, size nasıl yardımcı olabilirim?</i></center>")
+                self.clear_transcript(WELCOME_HTML)
                 self.statusBar().showMessage(f"🆕 Yeni proje oluşturuldu: {project_name}", 3000)
                 self.save_app_state()
         except Exception as e:
@@ -1204,7 +1389,8 @@ class MainApplication(QMainWindow):
                 if item.parent():
                     chat_id = item.data(0, Qt.ItemDataRole.UserRole)
                     if chat_id and chat_id in self.chat_data:
-                        self.chat_data[chat_id]["title"] = item.text(0).replace("💬 ", "")
+                        self.chat_data.set_title(chat_id, item.text(0).replace("💬 ", ""))
+                        self.saver.save_chat(chat_id, self.chat_data.title(chat_id))
                 self.save_app_state()
         
         except Exception as e:
@@ -1245,6 +1431,8 @@ class MainApplication(QMainWindow):
             )
 
             self.setStyleSheet(combined_css)
+            if self.renderer.set_style(theme_name, self.font_family, self.font_size):
+                self.render_refresh_timer.start()
         except Exception as e:
             logger.error(f"Tema yüklenirken hata: {str(e)}")
             
@@ -1374,7 +1562,13 @@ class MainApplication(QMainWindow):
             export_action = menu.addAction(QIcon("icons/export.png"), "Sohbeti Dışa Aktar")
             export_action.triggered.connect(self.export_selected_chat)
 
-            menu.exec(self.chat_display.mapToGlobal(pos))
+            # Arşivle
+            item = self.chat_list.itemAt(pos)
+            if item:
+                archive_action = menu.addAction("🗄️ Arşivle")
+                archive_action.triggered.connect(lambda: self.archive_chat(item.data(Qt.ItemDataRole.UserRole)))
+
+            menu.exec(self.chat_list.viewport().mapToGlobal(pos))
         except Exception as e:
             logger.error(f"Bağlam menüsü gösterilirken hata: {str(e)}")
 
@@ -1418,6 +1612,177 @@ class MainApplication(QMainWindow):
         except Exception as e:
             logger.error(f"Sohbet yeniden adlandırılırken hata: {str(e)}")
 
+    def delete_selected_chat(self):
+        """Sohbet listesinde seçili sohbeti sil"""
+        try:
+            item = self.chat_list.currentItem()
+            if not item:
+                return
+            chat_id = item.data(Qt.ItemDataRole.UserRole)
+            if chat_id in self.chat_data:
+                del self.chat_data[chat_id]
+                self.saver.delete_chat(chat_id)
+            self.chat_list.takeItem(self.chat_list.row(item))
+            if chat_id == self.active_chat_id:
+                self.active_chat_id = None
+                self.clear_transcript()
+            self.statusBar().showMessage("🗑️ Sohbet silindi", 3000)
+            self.save_app_state()
+        except Exception as e:
+            logger.error(f"Sohbet silinirken hata: {str(e)}")
+
+    def export_selected_chat(self):
+        """Sohbet listesinde seçili sohbeti JSON olarak dışa aktar"""
+        try:
+            item = self.chat_list.currentItem()
+            if not item:
+                return
+            chat_id = item.data(Qt.ItemDataRole.UserRole)
+            file_path, _ = QFileDialog.getSaveFileName(
+                self, "Sohbeti Dışa Aktar", create_safe_filename(item.text()) + ".json", "JSON Dosyaları (*.json)"
+            )
+            if file_path:
+                with open(file_path, "w", encoding="utf-8") as f:
+                    json.dump(self.chat_data.complete(chat_id).to_dict(), f, indent=2, ensure_ascii=False)
+                self.statusBar().showMessage(f"📤 Sohbet dışa aktarıldı: {file_path}", 3000)
+        except Exception as e:
+            logger.error(f"Sohbet dışa aktarılırken hata: {str(e)}")
+
+    def make_archive_item(self, chat_id, title):
+        item = QTreeWidgetItem([title])
+        item.setData(0, Qt.ItemDataRole.UserRole, chat_id)
+        return item
+
+    def update_archive_root(self):
+        """Arşiv düğümünün başlığında arşivdeki sohbet sayısını gösterir"""
+        count = self.archive_root.childCount()
+        self.archive_root.setText(0, f"🗄️ Arşiv ({count})" if count else "🗄️ Arşiv")
+
+    def archive_chat(self, chat_id):
+        """Sohbeti sıkıştırılmış arşive taşır ve sohbet listesinden kaldırır"""
+        try:
+            if chat_id not in self.chat_data or chat_id in self.archive:
+                return False
+            if self.dispatcher.is_busy(chat_id):
+                self.statusBar().showMessage("⏳ Yanıt beklenen sohbet arşivlenemez", 3000)
+                return False
+            title = self.chat_data.title(chat_id)
+            # Arşive yazma ve sıcak depodan silme arka planda, sırayla yapılır
+            if self.chat_data.is_loaded(chat_id) and not self.chat_data[chat_id].offset:
+                messages = [m.to_dict() for m in self.chat_data[chat_id].messages]
+                self.saver.submit(self.archive.add, chat_id, title, messages)
+            else:
+                # Bellekte olmayan ya da kısmen yüklü sohbet depodan kaydedici iş parçacığında okunur
+                self.saver.submit(lambda: self.archive.add(chat_id, title, self.store.load_chat(chat_id)))
+            self.saver.delete_chat(chat_id)
+            self.chat_data.add(chat_id, {"title": title})
+
+            for i in range(self.chat_list.count()):
+                if self.chat_list.item(i).data(Qt.ItemDataRole.UserRole) == chat_id:
+                    self.chat_list.takeItem(i)
+                    break
+            self.archive_root.insertChild(0, self.make_archive_item(chat_id, title))
+            self.update_archive_root()
+            self.statusBar().showMessage(f"🗄️ Arşivlendi: {title}", 3000)
+            self.save_app_state()
+            return True
+        except Exception as e:
+            logger.error(f"Sohbet arşivlenirken hata: {str(e)}")
+            return False
+
+    def auto_archive_chats(self):
+        """ARCHIVE_AFTER_DAYS gündür mesaj gelmeyen sohbetleri arşivler"""
+        if not self.ARCHIVE_AFTER_DAYS:
+            return
+        try:
+            before = time.time() - self.ARCHIVE_AFTER_DAYS * 86400
+            listed = {
+                self.chat_list.item(i).data(Qt.ItemDataRole.UserRole) for i in range(self.chat_list.count())
+            }
+            # Proje sohbetleri ve açık sohbet yerinde kalır
+            idle = [
+                chat_id for chat_id in self.store.idle_chats(before)
+                if chat_id in listed and chat_id != self.active_chat_id
+            ]
+            for chat_id in idle:
+                self.archive_chat(chat_id)
+            if idle:
+                logger.info(f"{len(idle)} sohbet otomatik arşivlendi")
+        except Exception as e:
+            logger.error(f"Otomatik arşivleme sırasında hata: {str(e)}")
+
+    def unarchive_chat(self, chat_id):
+        """Arşivdeki sohbeti sohbet listesine geri taşır"""
+        try:
+            if chat_id not in self.archive:
+                return
+            chat = self.chat_data[chat_id]
+            # Arşivden çıkan sohbet yeni etkinlik sayılır; hemen yeniden arşivlenmez
+            self.saver.submit(
+                self.store.import_chat, chat_id, chat.title, [m.to_dict() for m in chat.messages], to_iso(time.time())
+            )
+            self.saver.submit(self.archive.remove, chat_id)
+
+            for i in range(self.archive_root.childCount()):
+                if self.archive_root.child(i).data(0, Qt.ItemDataRole.UserRole) == chat_id:
+                    self.archive_root.takeChild(i)
+                    break
+            self.update_archive_root()
+            item = QListWidgetItem(chat.title)
+            item.setData(Qt.ItemDataRole.UserRole, chat_id)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsEditable)
+            self.chat_list.insertItem(0, item)
+            self.chat_list.setCurrentItem(item)
+            self.statusBar().showMessage(f"📂 Arşivden çıkarıldı: {chat.title}", 3000)
+            self.save_app_state()
+        except Exception as e:
+            logger.error(f"Sohbet arşivden çıkarılırken hata: {str(e)}")
+
+    def load_archived_chat(self, item, column):
+        """Arşivdeki sohbeti açar; mesajlar arşivden açılarak okunur"""
+        try:
+            chat_id = item.data(0, Qt.ItemDataRole.UserRole)
+            if not chat_id:
+                return
+            self.show_transcript(self.chat_data[chat_id].messages)
+            self.active_chat_id = chat_id
+            self.chat_list.clearSelection()
+            self.statusBar().showMessage(f"🗄️ {item.text(0)} (arşiv) yüklendi", 3000)
+        except Exception as e:
+            logger.error(f"Arşivdeki sohbet yüklenirken hata: {str(e)}")
+
+    def show_archive_context_menu(self, pos):
+        """Arşivdeki sohbetler için bağlam menüsü"""
+        try:
+            item = self.archive_tree.itemAt(pos)
+            if not item or not item.parent():
+                return
+            chat_id = item.data(0, Qt.ItemDataRole.UserRole)
+            menu = QMenu()
+            restore_action = menu.addAction("📂 Arşivden Çıkar")
+            restore_action.triggered.connect(lambda: self.unarchive_chat(chat_id))
+            delete_action = menu.addAction(QIcon("icons/delete.png"), "Sil")
+            delete_action.triggered.connect(lambda: self.delete_archived_chat(item))
+            menu.exec(self.archive_tree.viewport().mapToGlobal(pos))
+        except Exception as e:
+            logger.error(f"Bağlam menüsü gösterilirken hata: {str(e)}")
+
+    def delete_archived_chat(self, item):
+        """Arşivdeki sohbeti kalıcı olarak sil"""
+        try:
+            chat_id = item.data(0, Qt.ItemDataRole.UserRole)
+            self.saver.submit(self.archive.remove, chat_id)
+            if chat_id in self.chat_data:
+                del self.chat_data[chat_id]
+            self.archive_root.removeChild(item)
+            self.update_archive_root()
+            if chat_id == self.active_chat_id:
+                self.active_chat_id = None
+                self.clear_transcript()
+            self.statusBar().showMessage("🗑️ Arşivdeki sohbet silindi", 3000)
+        except Exception as e:
+            logger.error(f"Arşivdeki sohbet silinirken hata: {str(e)}")
+
     def translate_context_menu(self, menu):
         """Bağlam menüsü eylemlerini Türkçeye çevir"""
         translations = {
@@ -1449,10 +1814,8 @@ class MainApplication(QMainWindow):
             project_item.setExpanded(True)
             
             # Yeni sohbet verisini oluştur
-            self.chat_data[chat_id] = {
-                "title": chat_name,
-                "messages": []
-            }
+            self.chat_data[chat_id] = Chat(chat_name, [])
+            self.saver.save_chat(chat_id, chat_name)
             
             # Başlığı düzenlemek için aç
             self.projects_tree.editItem(new_chat, 0)
@@ -1462,7 +1825,7 @@ class MainApplication(QMainWindow):
             logger.error(f"Projeye sohbet eklenirken hata: {str(e)}")
             
     def export_chats(self):
-        default_name = create_safe_filename(self.chat_data[self.active_chat_id]["title"])
+        default_name = create_safe_filename(self.chat_data.title(self.active_chat_id))
         file_path, _ = QFileDialog.getSaveFileName(
             self, "Sohbetleri Dışa Aktar", default_name, "JSON Dosyaları (*.json)"
         )
@@ -1478,6 +1841,7 @@ class MainApplication(QMainWindow):
                     chat_id = child.data(0, Qt.ItemDataRole.UserRole)
                     if chat_id in self.chat_data:
                         del self.chat_data[chat_id]
+                        self.saver.delete_chat(chat_id)
                 root = self.projects_tree.invisibleRootItem()
                 (root if item.parent() is None else item.parent()).removeChild(item)
                 self.statusBar().showMessage("🗑️ Proje silindi", 3000)
@@ -1492,6 +1856,7 @@ class MainApplication(QMainWindow):
             chat_id = item.data(0, Qt.ItemDataRole.UserRole)
             if chat_id in self.chat_data:
                 del self.chat_data[chat_id]
+                self.saver.delete_chat(chat_id)
             parent = item.parent()
             parent.removeChild(item)
             self.statusBar().showMessage("🗑️ Proje sohbeti silindi", 3000)
@@ -1503,7 +1868,20 @@ class MainApplication(QMainWindow):
     def quit_application(self):
         """Uygulamadan tamamen çık"""
         self.tray_icon.hide()
-        self.save_app_state()
+        # Yarım kalan yanıtlar kayıttan önce sohbete eklensin diye istekler önce durdurulur
+        for worker in self.dispatcher.cancel_all():
+            if not worker.wait(self.SHUTDOWN_WAIT_MS):
+                logger.warning("Durdurulan istek zamanında bitmedi")
+        # İş parçacıklarından kuyruğa düşen iptal sinyalleri işlenir
+        QApplication.processEvents()
+        self.write_app_state()
+        if not self.saver.close():
+            QMessageBox.warning(
+                self, "Kayıt Hatası",
+                f"{len(self.saver.failed)} değişiklik diske yazılamadı. Ayrıntılar app.log dosyasında."
+            )
+        self.store.close()
+        self.renderer.close()
         QApplication.quit()
     
     def load_api_key(self):
@@ -1513,6 +1891,13 @@ class MainApplication(QMainWindow):
                 with open("api_config.json", "r") as f:
                     config = json.load(f)
                     self.api_key = config.get("api_key")
+                    if "max_concurrent_requests" in config:
+                        self.dispatcher.set_max_concurrent(config["max_concurrent_requests"])
+                    if "http_pool_size" in config or "http2" in config:
+                        http_client.configure(
+                            pool_size=config.get("http_pool_size", http_client.DEFAULT_POOL_SIZE),
+                            http2=config.get("http2", False)
+                        )
         
         except Exception as e:
             logger.error(f"API anahtarı yüklenirken hata: {str(e)}")
@@ -1520,67 +1905,119 @@ class MainApplication(QMainWindow):
     def save_api_key(self, api_key):
         """API anahtarını kaydet"""
         try:
+            # Havuz ayarları gibi diğer anahtarları koru
+            config = {}
+            if os.path.exists("api_config.json"):
+                with open("api_config.json", "r") as f:
+                    config = json.load(f)
+            config["api_key"] = api_key
             with open("api_config.json", "w") as f:
-                json.dump({"api_key": api_key}, f)
+                json.dump(config, f)
             self.api_key = api_key
             self.statusBar().showMessage("🔑 API anahtarı kaydedildi", 3000)
         
         except Exception as e:
             logger.error(f"API anahtarı kaydedilirken hata: {str(e)}")
     
-    def get_response_from_openrouter(self, model_name):
-        """OpenRouter API'sinden yanıt al"""
+    def get_response_from_openrouter(self, model_name, chat_id=None, bypass_cache=False):
+        """OpenRouter API isteğini arka plan iş parçacığında başlatır, GUI'yi bloklamaz"""
+        # Yanıt, isteğin çıktığı sohbete yazılır (aktif sohbet değişse bile)
+        chat_id = chat_id or self.active_chat_id
         try:
-            url = f"{self.api_base_url}/chat/completions"
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://github.com/CxReiS/DeepSeekChat",
-                "X-Title": "DeepSeek Chat"
-            }
-            
-            # Sohbet geçmişini hazırla
+            # Sohbet geçmişini hazırla; proje talimatları bağlam kırpılırken sabit tutulur
             messages = []
-            for msg in self.chat_data[self.active_chat_id]["messages"]:
-                role = "user" if msg["sender"] == "user" else "assistant"
-                messages.append({"role": role, "content": msg["message"]})
+            instructions = self.get_project_instructions(chat_id)
+            if instructions:
+                messages.append({"role": "system", "content": instructions})
+            self.load_history_for_context(chat_id)
+            for msg in self.chat_data[chat_id].messages:
+                messages.append({"role": msg.role, "content": msg.text})
             
             # OpenRouter model ID'sini al
             openrouter_model = self.model_mapping.get(model_name, "deepseek/deepseek-r1:free")
-            data = {
-                "model": openrouter_model,
-                "messages": messages,
-                "temperature": 0.7,
-                "max_tokens": 4096
-            }
-            response = requests.post(url, headers=headers, json=data, timeout=120)
-            response_data = response.json()
-            if response.status_code == 200:
-                assistant_reply = response_data["choices"][0]["message"]["content"]
-                
-                # Yanıtı ekrana ve hafızaya ekle
-                self.append_message("assistant", assistant_reply)
-                self.chat_data[self.active_chat_id]["messages"].append({
-                    "sender": "assistant",
-                    "message": assistant_reply,
-                    "timestamp": QDateTime.currentDateTime().toString(Qt.DateFormat.ISODate)
-                })
-                self.statusBar().showMessage(f"✅ Yanıt alındı ({model_name})", 3000)
-                self.save_app_state()
+            worker = WorkerThread(
+                self.api_key, messages, openrouter_model, stream=True,
+                cache=self.response_cache, use_cache=not bypass_cache,
+                fallback_models=self.get_fallback_models(model_name)
+            )
+            worker.thinking_updated.connect(self.handle_thinking_update)
+            worker.model_fallback.connect(self.handle_model_fallback)
+            worker.rate_limited.connect(self.handle_rate_limited)
+            worker.context_trimmed.connect(
+                lambda dropped, tokens: self.statusBar().showMessage(
+                    f"✂️ Bağlam sınırı: en eski {dropped} mesaj gönderilmedi ({tokens} token)", 3000
+                )
+            )
+            worker.chunk_received.connect(lambda chunk: self.handle_stream_chunk(chat_id, chunk))
+            worker.response_received.connect(
+                lambda reply, elapsed: self.handle_api_response(
+                    chat_id, reply, self.get_model_name(worker.used_model),
+                    cached_in=elapsed if worker.from_cache else None
+                )
+            )
+            worker.error_occurred.connect(lambda err: self.handle_api_error(chat_id, err, model_name))
+            worker.cancelled.connect(lambda partial: self.handle_generation_cancelled(chat_id, partial))
+
+            # İş parçacığı bitene kadar dağıtıcıda referansla tutulur
+            self.stream_buffers[chat_id] = []
+            self.dispatcher.start(chat_id, worker)
+            if self.dispatcher.queue_position(chat_id):
+                self.statusBar().showMessage("🕒 İstek sırada, eşzamanlı istek sınırı dolu...")
             else:
-                error_msg = response_data.get("error", {}).get("message", "Bilinmeyen hata")
-                self.statusBar().showMessage(f"❌ Hata: {error_msg}", 5000)
-                logger.error(f"API hatası: {response.status_code} - {error_msg}")
-                
-                # Hata durumunda simülasyon yap
-                QTimer.singleShot(1500, lambda: self.simulate_response(model_name))
+                self.statusBar().showMessage("⏳ DeepSeek yanıt oluşturuyor...")
         
         except Exception as e:
+            self.dispatcher.release(chat_id)
             logger.error(f"API isteği sırasında hata: {str(e)}")
             self.statusBar().showMessage(f"❌ İstek hatası: {str(e)}", 5000)
-            # Hata durumunda simülasyon yap
-            QTimer.singleShot(1500, lambda: self.simulate_response(model_name))
     
+    def get_project_instructions(self, chat_id):
+        """Sohbetin bağlı olduğu projenin talimatlarını döndürür"""
+        def find_chat(item):
+            if item.data(0, Qt.ItemDataRole.UserRole) == chat_id:
+                return item
+            for j in range(item.childCount()):
+                found = find_chat(item.child(j))
+                if found:
+                    return found
+            return None
+
+        for i in range(self.projects_tree.topLevelItemCount()):
+            project = self.projects_tree.topLevelItem(i)
+            chat_item = find_chat(project)
+            if chat_item and chat_item is not project:
+                return self.project_context.get(id(project), {}).get("instructions", "").strip()
+        return ""
+
+    def get_fallback_models(self, model_name):
+        """model_mapping sırasında seçili modelden sonra gelen OpenRouter modellerini döndürür"""
+        names = list(self.model_mapping)
+        if model_name in names:
+            index = names.index(model_name)
+            names = names[index + 1:] + names[:index]
+        return [self.model_mapping[name] for name in names]
+
+    def get_model_name(self, openrouter_model):
+        """OpenRouter model ID'sinin arayüzdeki adını döndürür"""
+        for name, model_id in self.model_mapping.items():
+            if model_id == openrouter_model:
+                return name
+        return openrouter_model
+
+    def handle_model_fallback(self, failed_model, fallback_model):
+        """Devresi açık model yerine yedek modele geçildiğini bildirir"""
+        self.statusBar().showMessage(
+            f"🔀 {self.get_model_name(failed_model)} yanıt vermiyor, "
+            f"{self.get_model_name(fallback_model)} kullanılıyor...", 5000
+        )
+
+    def handle_rate_limited(self, position, eta):
+        """Hız sınırı nedeniyle bekleyen isteğin sırasını ve tahmini süresini gösterir"""
+        self.statusBar().showMessage(
+            f"🚦 Hız sınırı: istek {max(position, 1)}. sırada, yaklaşık {eta:.0f} sn içinde gönderilecek",
+            int(eta * 1000) + 1000
+        )
+
     def send_message(self):
         try:
             message = self.message_input.toPlainText().strip()
@@ -1595,14 +2032,20 @@ class MainApplication(QMainWindow):
                 file_name = os.path.basename(file_path)
                 message += f"\n\n[📎 Ek: {file_name}]"
             
+            # Sohbette bekleyen istek varsa veya mesaj yineleniyorsa gönderme
+            if not self.dispatcher.try_acquire(self.active_chat_id, message):
+                return
+
+            # Arşivdeki sohbete yazılırsa sohbet yeniden etkinleşir
+            if self.active_chat_id in self.archive:
+                self.unarchive_chat(self.active_chat_id)
+            
             # Kullanıcı mesajını ekrana ve hafızaya ekle
             self.append_message("user", message)
-            self.chat_data[self.active_chat_id]["messages"].append({
-                "sender": "user",
-                "message": message,
-                "timestamp": QDateTime.currentDateTime().toString(Qt.DateFormat.ISODate)
-            })
-            if len(self.chat_data[self.active_chat_id]["messages"]) == 1:
+            user_message = Message.now(Sender.USER, message)
+            self.chat_data[self.active_chat_id].messages.append(user_message)
+            self.saver.add_message(self.active_chat_id, user_message.to_dict())
+            if len(self.chat_data[self.active_chat_id].messages) == 1:
                 words = message.split()[:4]
                 new_title = " ".join(words)
                 if len(new_title) > 25:
@@ -1613,28 +2056,13 @@ class MainApplication(QMainWindow):
             # Aktif modeli al
             model_name = self.model_combo.currentText()
             
-            # API iş parçacığı
-            self.worker = WorkerThread(
-                api_key="demo-key",
-                conversation_history=[{"role": msg['sender'], "content": msg['message']} for msg in self.chat_data[self.active_chat_id]["messages"]],
-                model=model_name
-            )
-            self.worker.thinking_updated.connect(self.handle_thinking_update)
-            self.worker.response_received.connect(lambda reply, t: self.handle_api_response(reply, model_name))
-            self.worker.error_occurred.connect(lambda err: self.statusBar().showMessage(err, 5000))
-            self.worker.start()
-            self.statusBar().showMessage("⏳ DeepSeek yanıt oluşturuyor...")
+            # Sohbet başına tek API isteği; Shift ile gönderim önbelleği atlar
             if self.api_key:
-                history = []
-                for msg in self.chat_data[self.active_chat_id]["messages"]:
-                    role = "user" if msg["sender"] == "user" else "assistant"
-                    history.append({"role": role, "content": msg["message"]})
-                self.worker = WorkerThread(self.api_key, history, self.model_mapping.get(model_name, "deepseek/deepseek-r1:free"))
-                self.worker.response_received.connect(lambda reply, _: self.handle_api_response(reply, model_name))
-                self.worker.error_occurred.connect(lambda err: self.handle_api_error(err, model_name))
-                self.worker.start()
+                bypass_cache = bool(QApplication.keyboardModifiers() & Qt.KeyboardModifier.ShiftModifier)
+                self.get_response_from_openrouter(model_name, self.active_chat_id, bypass_cache)
             else:
-                QTimer.singleShot(1500, lambda: self.simulate_response(model_name))
+                self.dispatcher.release(self.active_chat_id)
+                self.statusBar().showMessage("🔑 API anahtarı tanımlı değil (Ayarlar > Model Yönetimi)", 5000)
             
             # Ekli dosyaları temizle
             self.attached_files = []
@@ -1643,6 +2071,7 @@ class MainApplication(QMainWindow):
             self.save_app_state()
         
         except Exception as e:
+            self.dispatcher.release(self.active_chat_id)
             logger.error(f"Mesaj gönderilirken hata: {str(e)}")
             
     def model_changed(self, index):
@@ -1655,27 +2084,236 @@ class MainApplication(QMainWindow):
         else:
             self.message_input.setPlaceholderText("DeepSeek'e mesaj yazın...")
 
-    def append_message(self, sender, message):
-        """Sohbet ekranına mesaj ekler"""
+    def transcript_virtualized(self):
+        """Aktif sohbet sanal mesaj listesinde mi gösteriliyor"""
+        return self.chat_stack.currentWidget() is self.transcript_view
+
+    def format_message(self, sender, text):
+        """Mesajın önbellekteki Markdown çıktısıyla sohbet HTML'i"""
+        return message_html(sender, self.renderer.render(text))
+
+    def handle_rendered(self, key):
+        """Arka planda işlenmesi biten mesajı bir sonraki toplu güncellemeye ekler"""
+        self.rendered_keys.add(key)
+        self.rendered_timer.start()
+
+    def apply_rendered(self):
+        """İşlenmesi biten mesajları yalnızca kendi satırında/çerçevesinde yeniden çizer"""
+        keys, self.rendered_keys = self.rendered_keys, set()
         try:
-            cursor = self.chat_display.textCursor()
-            cursor.movePosition(QTextCursor.MoveOperation.End)
+            if self.transcript_virtualized():
+                self.transcript_view.refresh_rows(
+                    lambda text: is_heavy(text) and self.renderer.make_key(text) in keys
+                )
+                return
+            root = self.chat_display.document().rootFrame()
+            for frame in root.childFrames():
+                text = frame.frameFormat().property(PENDING_TEXT_PROPERTY)
+                if text and self.renderer.make_key(text) in keys:
+                    sender = frame.frameFormat().property(PENDING_SENDER_PROPERTY)
+                    self.fill_message_frame(frame, sender, text)
+        except Exception as e:
+            logger.error(f"İşlenen mesaj gösterilirken hata: {str(e)}")
+
+    def insert_messages(self, cursor, messages):
+        """(gönderen, metin) çiftlerini imlecin yerine ekler.
+
+        Arka planda işlenmesi süren mesajlar kendi çerçevelerine konur; sonuç
+        gelince belgenin geri kalanına dokunmadan yalnızca o çerçeve yazılır.
+        """
+        html = []
+        for sender, text in messages:
+            rendered = self.format_message(sender, text)
+            if not self.renderer.is_pending(text):
+                html.append(rendered)
+                continue
+            if html:
+                cursor.insertHtml("".join(html))
+                html = []
+            frame = cursor.insertFrame(QTextFrameFormat())
+            self.fill_message_frame(frame, sender, text, rendered)
+            cursor.setPosition(frame.lastPosition() + 1)
+        if html:
+            cursor.insertHtml("".join(html))
+
+    def fill_message_frame(self, frame, sender, text, rendered=None):
+        """Çerçevedeki mesajı güncel HTML'iyle yeniden yazar; kullanıcının baktığı yer kaymaz"""
+        scroll_bar = self.chat_display.verticalScrollBar()
+        from_bottom = scroll_bar.maximum() - scroll_bar.value()
+        cursor = frame.firstCursorPosition()
+        cursor.setPosition(frame.lastPosition(), QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertHtml(rendered or self.format_message(sender, text))
+        frame_format = frame.frameFormat()
+        if self.renderer.is_pending(text):
+            frame_format.setProperty(PENDING_SENDER_PROPERTY, sender)
+            frame_format.setProperty(PENDING_TEXT_PROPERTY, text)
+        else:
+            frame_format.clearProperty(PENDING_SENDER_PROPERTY)
+            frame_format.clearProperty(PENDING_TEXT_PROPERTY)
+        frame.setFrameFormat(frame_format)
+        scroll_bar.setValue(scroll_bar.maximum() - from_bottom)
 
-            if sender == "user":
-                prefix = "Siz:"
-                msg_class = "user-message"
+    def refresh_transcript(self):
+        """Değişen tema veya yazı tipi için aktif sohbeti yeniden çizer"""
+        try:
+            if self.stream_started() or self.stream_pending:
+                # Akış sürerken belge yeniden kurulmaz, bittikten sonra denenir
+                self.render_refresh_timer.start()
+                return
+            chat_id = self.active_chat_id
+            if not chat_id or chat_id not in self.chat_data:
+                return
+            if self.transcript_virtualized():
+                self.transcript_view.refresh()
+                return
+            scroll_bar = self.chat_display.verticalScrollBar()
+            self.show_transcript(self.chat_data[chat_id].messages, scroll_bar.maximum() - scroll_bar.value())
+        except Exception as e:
+            logger.error(f"Sohbet yenilenirken hata: {str(e)}")
+
+    def show_transcript(self, messages, from_bottom=0):
+        """Sohbetin mesajlarını uygun görünümde baştan gösterir"""
+        try:
+            started = time.perf_counter()
+            self.reset_stream()
+            self.render_generation += 1
+            # Temizlenen görünümün kaydırma sinyalleri eski sayfa yüklemesini tetiklemesin
+            self.transcript_busy = True
+            if len(messages) >= VIRTUALIZE_THRESHOLD:
+                self.chat_display.clear()
+                self.chat_stack.setCurrentWidget(self.transcript_view)
+                self.transcript_view.set_messages([(msg.role, msg.text) for msg in messages], from_bottom)
+                self.transcript_busy = False
+                self.log_render_time(len(messages), started)
+                return
+
+            self.transcript_view.clear()
+            self.chat_stack.setCurrentWidget(self.chat_display)
+            # En yeni mesajlar tek seferde çizilir, eskiler sonraki turlarda başa eklenir;
+            # böylece sonradan eklenen mesajlar ve akış yanıtı her zaman sonda kalır
+            chunks = [messages[i:i + self.RENDER_CHUNK] for i in range(0, len(messages), self.RENDER_CHUNK)]
+            newest = chunks.pop() if chunks else []
+            self.chat_display.clear()
+            self.insert_messages(QTextCursor(self.chat_display.document()), [(msg.role, msg.text) for msg in newest])
+            scroll_bar = self.chat_display.verticalScrollBar()
+            scroll_bar.setValue(scroll_bar.maximum() - from_bottom)
+            if chunks:
+                generation = self.render_generation
+                QTimer.singleShot(0, lambda: self.render_older_messages(generation, chunks, len(messages), started))
             else:
-                prefix = "DeepSeek:"
-                msg_class = "assistant-message"
-
-            html_content = (
-                f"<div class='chat-message {msg_class}'>"
-                f"<span class='sender'>{prefix}</span>"
-                f"<div class='message-text'>{message}</div>"
-                "</div>"
-            )
+                self.transcript_busy = False
+                self.log_render_time(len(messages), started)
+        except Exception as e:
+            self.transcript_busy = False
+            logger.error(f"Sohbet gösterilirken hata: {str(e)}")
 
-            self.chat_display.insertHtml(html_content)
+    def render_older_messages(self, generation, chunks, total, started):
+        """Açılan sohbetin kalan eski mesajlarını parça parça başa ekler"""
+        try:
+            if generation != self.render_generation:
+                return  # Bu arada başka sohbet açıldı
+            self.prepend_to_display(chunks.pop())
+            if chunks:
+                QTimer.singleShot(0, lambda: self.render_older_messages(generation, chunks, total, started))
+            else:
+                self.transcript_busy = False
+                self.log_render_time(total, started)
+        except Exception as e:
+            self.transcript_busy = False
+            logger.error(f"Eski mesajlar gösterilirken hata: {str(e)}")
+
+    def prepend_to_display(self, messages):
+        """Mesajları metin görünümünün başına ekler; kullanıcının baktığı yer kaymaz"""
+        scroll_bar = self.chat_display.verticalScrollBar()
+        from_bottom = scroll_bar.maximum() - scroll_bar.value()
+        cursor = QTextCursor(self.chat_display.document())
+        cursor.movePosition(QTextCursor.MoveOperation.Start)
+        self.insert_messages(cursor, [(msg.role, msg.text) for msg in messages])
+        scroll_bar.setValue(scroll_bar.maximum() - from_bottom)
+
+    def log_render_time(self, count, started):
+        elapsed = (time.perf_counter() - started) * 1000
+        logger.debug(f"{count} mesaj {elapsed:.1f} ms içinde gösterildi")
+        # Ekranı doldurmayan kısa sayfalarda kaydırma olmayacağı için eski sayfa hemen istenir
+        QTimer.singleShot(0, self.maybe_load_older)
+
+    def maybe_load_older(self, *_):
+        """Görünüm en üste kaydırıldığında sohbetin bir önceki sayfasını yükler"""
+        try:
+            chat_id = self.active_chat_id
+            if self.transcript_busy or not chat_id or not self.chat_data.is_loaded(chat_id):
+                return
+            if not self.chat_data[chat_id].offset:
+                return
+            view = self.chat_stack.currentWidget()
+            scroll_bar = view.verticalScrollBar()
+            # Gizli görünüm dizilmediği için kaydırma çubuğu her zaman en üstte görünür
+            if not view.isVisible() or scroll_bar.value() > scroll_bar.minimum():
+                return
+            self.transcript_busy = True
+            try:
+                older = self.chat_data.load_older(chat_id)
+                self.show_older_messages(chat_id, older)
+            finally:
+                self.transcript_busy = False
+            self.statusBar().showMessage(f"⏫ {len(older)} eski mesaj yüklendi", 2000)
+            QTimer.singleShot(0, self.maybe_load_older)
+        except Exception as e:
+            logger.error(f"Eski mesajlar yüklenirken hata: {str(e)}")
+
+    def show_older_messages(self, chat_id, older):
+        """Sonradan yüklenen eski mesajları açık sohbetin başına ekler"""
+        if not older or chat_id != self.active_chat_id:
+            return
+        if self.transcript_virtualized():
+            if self.stream_row is not None:
+                self.stream_row += len(older)  # akış satırı aşağı kaydı
+            self.transcript_view.prepend_messages([(msg.role, msg.text) for msg in older])
+            return
+        streaming = self.stream_started() or self.stream_pending
+        if not streaming and len(self.chat_data[chat_id].messages) >= VIRTUALIZE_THRESHOLD:
+            # Metin görünümü uzadı; sanal listeye geçilir
+            scroll_bar = self.chat_display.verticalScrollBar()
+            self.show_transcript(self.chat_data[chat_id].messages, scroll_bar.maximum() - scroll_bar.value())
+            return
+        self.prepend_to_display(older)
+
+    def load_history_for_context(self, chat_id):
+        """En geniş bağlam penceresini doldurmaya yetecek kadar eski mesajı yükler"""
+        chat = self.chat_data[chat_id]
+        if not chat.offset:
+            return
+        budget = max(MODEL_CONTEXT_WINDOWS.values(), default=DEFAULT_CONTEXT_WINDOW)
+        used = sum(count_tokens(msg.text) for msg in chat.messages)
+        while chat.offset and used < budget:
+            older = self.chat_data.load_older(chat_id)
+            used += sum(count_tokens(msg.text) for msg in older)
+            self.show_older_messages(chat_id, older)
+
+    def clear_transcript(self, html=None):
+        """Sohbet ekranını temizler, istenirse karşılama metnini gösterir"""
+        self.reset_stream()
+        self.render_generation += 1
+        self.transcript_busy = True
+        self.transcript_view.clear()
+        if html:
+            self.chat_display.setHtml(html)
+        else:
+            self.chat_display.clear()
+        self.chat_stack.setCurrentWidget(self.chat_display)
+        self.transcript_busy = False
+
+    def append_message(self, sender, message):
+        """Sohbet ekranına mesaj ekler"""
+        try:
+            if self.transcript_virtualized():
+                self.transcript_view.append_message(sender, message)
+                return
+
+            cursor = QTextCursor(self.chat_display.document())
+            cursor.movePosition(QTextCursor.MoveOperation.End)
+            self.insert_messages(cursor, [(sender, message)])
+            self.chat_display.setTextCursor(cursor)
             self.chat_display.ensureCursorVisible()
         except Exception as e:
             logger.error(f"Mesaj eklenirken hata: {str(e)}")
@@ -1738,21 +2376,215 @@ class MainApplication(QMainWindow):
         """Özel hata yöneticisi"""
         error_msg = f"{exc_type.__name__}: {exc_value}"
         logger.error("Unhandled exception", exc_info=(exc_type, exc_value, exc_traceback))
+        # Çökme öncesi bekleyen kayıtları diske indir
+        try:
+            self.write_app_state()
+            if not self.saver.flush():
+                logger.error("Bekleyen kayıtların bir kısmı yazılamadı")
+        except Exception as e:
+            logger.error(f"Bekleyen kayıtlar yazılırken hata: {str(e)}")
         # Hata diyaloğunu göster
         error_dialog = ErrorDialog(error_msg, self)
         error_dialog.exec()
     
-    def handle_api_response(self, reply, model_name):
+    def set_response_cache_enabled(self, enabled):
+        """Yanıt önbelleğini açar veya kapatır"""
+        if enabled and self.response_cache is None:
+            self.response_cache = ResponseCache()
+        elif not enabled:
+            self.response_cache = None
+        self.statusBar().showMessage(
+            "⚡ Yanıt önbelleği açık" if enabled else "Yanıt önbelleği kapalı", 3000
+        )
+
+    def handle_thinking_update(self, text):
+        """Düşünme adımlarını durum çubuğunda gösterir"""
+        self.statusBar().showMessage(text)
+
+    def handle_stream_chunk(self, chat_id, chunk):
+        """Streaming yanıtın yeni parçasını saklar, sohbet açıksa ekranın sonuna ekler"""
+        try:
+            self.stream_buffers.setdefault(chat_id, []).append(chunk)
+            if chat_id == self.active_chat_id:
+                self.render_stream_chunk(chunk)
+        except Exception as e:
+            logger.error(f"Stream parçası eklenirken hata: {str(e)}")
+
+    def render_stream_chunk(self, chunk):
+        """Aktif sohbetteki streaming mesajına metin ekler; ekran kare başına bir kez güncellenir"""
+        self.stream_pending.append(chunk)
+        if not self.stream_timer.isActive():
+            self.stream_timer.start()
+
+    def flush_stream(self):
+        """Biriken akış parçalarını mesajın son bloğuna ekler; önceki metin yeniden dizilmez"""
+        try:
+            if not self.stream_pending:
+                return
+            text = "".join(self.stream_pending)
+            self.stream_pending.clear()
+            if self.transcript_virtualized():
+                if self.stream_row is None:
+                    self.stream_row = self.transcript_view.start_stream()
+                self.transcript_view.append_stream_text(self.stream_row, text)
+                return
+            scroll_bar = self.chat_display.verticalScrollBar()
+            at_bottom = scroll_bar.value() >= scroll_bar.maximum()
+            if self.stream_text_cursor is None:
+                cursor = QTextCursor(self.chat_display.document())
+                cursor.movePosition(QTextCursor.MoveOperation.End)
+                # Yanıt bitince Markdown hali yalnızca bu çerçeveye yazılır
+                cursor.insertFrame(QTextFrameFormat())
+                cursor.insertHtml(
+                    "<div class='chat-message assistant-message'>"
+                    "<span class='sender'>DeepSeek:</span>"
+                    "</div>"
+                )
+                cursor.insertBlock()
+                self.stream_text_cursor = cursor
+            self.stream_text_cursor.insertText(text)
+            if at_bottom:
+                # Yukarı kaydırıp okuyan kullanıcı sona çekilmez
+                scroll_bar.setValue(scroll_bar.maximum())
+        except Exception as e:
+            logger.error(f"Akış metni eklenirken hata: {str(e)}")
+
+    def reset_stream(self):
+        """Ekrandaki akışı bırakır (sohbet değişti veya yeniden çizildi)"""
+        self.stream_timer.stop()
+        self.stream_pending.clear()
+        self.stream_text_cursor = None
+        self.stream_row = None
+
+    def stream_started(self):
+        """Akış mesajı ekranda açıldı mı (hangi görünümde olursa olsun)"""
+        return self.stream_text_cursor is not None or self.stream_row is not None
+
+    def end_stream(self):
+        """Akışın kalan parçalarını yazar ve akış mesajını kapatır"""
+        self.flush_stream()
+        self.stream_timer.stop()
+        if self.stream_row is not None and self.transcript_virtualized():
+            self.transcript_view.finish_stream(self.stream_row)
+        self.stream_text_cursor = None
+        self.stream_row = None
+
+    def render_pending_stream(self, chat_id):
+        """Sohbet yeniden açıldığında devam eden yanıtın gelen kısmını gösterir"""
+        self.reset_stream()
+        self.update_stop_button()
+        partial = "".join(self.stream_buffers.get(chat_id, []))
+        if partial:
+            self.render_stream_chunk(partial)
+
+    def set_chat_pending(self, chat_id, state):
+        """Kenar çubuğunda sohbetin bekleyen istek durumunu gösterir"""
+        icon = QIcon("icons/update.png") if state else QIcon()
+        tooltips = {"queued": "🕒 Sırada bekliyor", "running": "⏳ Yanıt oluşturuluyor"}
+        tooltip = tooltips.get(state, "")
+
+        for i in range(self.chat_list.count()):
+            item = self.chat_list.item(i)
+            if item.data(Qt.ItemDataRole.UserRole) == chat_id:
+                item.setIcon(icon)
+                item.setToolTip(tooltip or self.chat_data.title(chat_id, item.text()))
+                return
+
+        def update_tree(item):
+            if item.data(0, Qt.ItemDataRole.UserRole) == chat_id:
+                item.setIcon(0, icon)
+                item.setToolTip(0, tooltip)
+                return True
+            for j in range(item.childCount()):
+                if update_tree(item.child(j)):
+                    return True
+            return False
+
+        for i in range(self.projects_tree.topLevelItemCount()):
+            if update_tree(self.projects_tree.topLevelItem(i)):
+                return
+
+    def handle_api_response(self, chat_id, reply, model_name, cached_in=None):
         try:
-            self.append_message("assistant", reply)
-            self.chat_data[self.active_chat_id]["messages"].append({
-                "sender": "assistant",
-                "message": reply,
-                "timestamp": QDateTime.currentDateTime().toString(Qt.DateFormat.ISODate),
-            })
+            streamed = bool(self.stream_buffers.pop(chat_id, None))
+            if chat_id == self.active_chat_id:
+                # Streaming ile gelen yanıt ekranda zaten parça parça oluşturuldu
+                self.flush_stream()
+                if not streamed or not self.stream_started():
+                    self.append_message("assistant", reply)
+                elif self.stream_text_cursor is not None:
+                    # Akışta düz metin olarak gelen yanıt kendi çerçevesinde Markdown olarak yazılır
+                    self.fill_message_frame(self.stream_text_cursor.currentFrame(), "assistant", reply)
+                self.end_stream()
+            if chat_id not in self.chat_data:
+                logger.warning(f"Yanıt gelen sohbet artık yok: {chat_id}")
+                return
+            assistant_message = Message.now(Sender.ASSISTANT, reply)
+            self.chat_data[chat_id].messages.append(assistant_message)
+            self.saver.add_message(chat_id, assistant_message.to_dict())
+            title = self.chat_data.title(chat_id)
+            if cached_in is not None:
+                self.statusBar().showMessage(
+                    f"⚡ Önbellekten yanıt: {title} ({model_name}, {cached_in * 1000:.0f} ms)", 3000
+                )
+            else:
+                self.statusBar().showMessage(f"✅ Yanıt alındı: {title} ({model_name})", 3000)
+            self.save_app_state()
         except Exception as e:
             logger.error(f"API yanıtı işlenirken hata: {str(e)}")
 
+    def update_stop_button(self):
+        """Durdur butonunu aktif sohbetin istek durumuna göre etkinleştirir"""
+        self.stop_btn.setEnabled(self.dispatcher.is_busy(self.active_chat_id))
+
+    def stop_generation(self):
+        """Aktif sohbetteki yanıt oluşturmayı durdurur"""
+        chat_id = self.active_chat_id
+        if self.dispatcher.cancel(chat_id) and chat_id not in self.dispatcher.in_flight:
+            # Sıradaki istek hiç başlamadığı için iptal sinyali gelmez
+            self.handle_generation_cancelled(chat_id, "")
+
+    def handle_generation_cancelled(self, chat_id, partial):
+        """Durdurulan yanıtın gelen kısmını sohbete kaydeder"""
+        try:
+            self.stream_buffers.pop(chat_id, None)
+            if chat_id == self.active_chat_id:
+                self.flush_stream()
+                if partial and not self.stream_started():
+                    self.append_message("assistant", partial)
+                self.end_stream()
+            if partial and chat_id in self.chat_data:
+                assistant_message = Message.now(Sender.ASSISTANT, partial)
+                self.chat_data[chat_id].messages.append(assistant_message)
+                self.saver.add_message(chat_id, assistant_message.to_dict())
+                self.save_app_state()
+            self.statusBar().showMessage("⏹ Yanıt durduruldu", 3000)
+        except Exception as e:
+            logger.error(f"Durdurulan yanıt işlenirken hata: {str(e)}")
+
+    def handle_api_error(self, chat_id, error, model_name):
+        """Arka plan isteğinden gelen hatayı gösterir; yarıda kesilen yanıtı işaretleyip kaydeder"""
+        try:
+            partial = "".join(self.stream_buffers.pop(chat_id, None) or [])
+            reply = partial + INTERRUPTED_NOTE if partial else ""
+            if chat_id == self.active_chat_id:
+                if partial:
+                    # Ekranda kalan yarım yanıt kaydedilenle aynı olsun diye işaret akışa eklenir
+                    self.render_stream_chunk(INTERRUPTED_NOTE)
+                    self.flush_stream()
+                    if self.stream_text_cursor is not None:
+                        self.fill_message_frame(self.stream_text_cursor.currentFrame(), "assistant", reply)
+                self.end_stream()
+            if partial and chat_id in self.chat_data:
+                assistant_message = Message.now(Sender.ASSISTANT, reply)
+                self.chat_data[chat_id].messages.append(assistant_message)
+                self.saver.add_message(chat_id, assistant_message.to_dict())
+                self.save_app_state()
+        except Exception as e:
+            logger.error(f"Yarım kalan yanıt kaydedilirken hata: {str(e)}")
+        self.statusBar().showMessage(f"❌ Hata ({model_name}): {error}", 5000)
+        logger.error(f"API hatası ({model_name}): {error}")
+
 if __name__ == "__main__":
     try:
         app = QApplication(sys.argv)
@@ -1766,7 +2598,7 @@ if __name__ == "__main__":
         # Pencereyi belirle
         window = None
         
-        user_manager = UserManager()
+        user_manager = UserManager(MainApplication.STORAGE_FORMAT)
         
          # Giriş bilgilerini kontrol et
         if os.path.exists("user_prefs.json"):
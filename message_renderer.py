@@ -0,0 +1,223 @@
+import re
+import html
+import queue
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from PyQt6.QtCore import QObject, pyqtSignal
+
+try:
+    from pygments import highlight
+    from pygments.lexers import get_lexer_by_name, guess_lexer
+    from pygments.formatters import HtmlFormatter
+    from pygments.util import ClassNotFound
+except ImportError:
+    highlight = None
+
+logger = logging.getLogger('DeepSeekChat.message_renderer')
+
+DEFAULT_RENDER_ENTRIES = 2048
+# Bu uzunluğu aşan ya da kod bloğu içeren mesajlar arka planda işlenir
+HEAVY_MESSAGE_CHARS = 2000
+CODE_STYLES = {"light": "friendly"}
+DEFAULT_CODE_STYLE = "monokai"
+
+FENCE_RE = re.compile(r"^```[ \t]*([\w+#.-]*)[^\n]*\n(.*?)(?:^```[ \t]*$|\Z)", re.MULTILINE | re.DOTALL)
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+BULLET_RE = re.compile(r"^\s*[-*+]\s+(.*)$")
+ORDERED_RE = re.compile(r"^\s*\d+[.)]\s+(.*)$")
+INLINE_CODE_RE = re.compile(r"`([^`\n]+)`")
+BOLD_RE = re.compile(r"\*\*(.+?)\*\*|__(.+?)__")
+ITALIC_RE = re.compile(r"(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])|(?<!\w)_(?!\s)(.+?)(?<!\s)_(?!\w)")
+LINK_RE = re.compile(r"\[([^\]\n]+)\]\((https?://[^)\s]+)\)")
+
+
+def is_heavy(text):
+    return "```" in text or len(text) > HEAVY_MESSAGE_CHARS
+
+
+def plain_html(text):
+    """Biçimlendirilmemiş metnin güvenli HTML hali (arka plan işi bitene kadar gösterilir)"""
+    return html.escape(text).replace("\n", "<br>")
+
+
+def render_inline(text):
+    """Satır içi Markdown: kod, kalın, italik ve bağlantılar"""
+    codes = []
+
+    def stash_code(match):
+        codes.append(f"<code>{match.group(1)}</code>")
+        return f"\x00{len(codes) - 1}\x00"
+
+    text = INLINE_CODE_RE.sub(stash_code, html.escape(text, quote=False))
+    text = LINK_RE.sub(r'<a href="\2">\1</a>', text)
+    text = BOLD_RE.sub(lambda m: f"<b>{m.group(1) or m.group(2)}</b>", text)
+    text = ITALIC_RE.sub(lambda m: f"<i>{m.group(1) or m.group(2)}</i>", text)
+    return re.sub(r"\x00(\d+)\x00", lambda m: codes[int(m.group(1))], text)
+
+
+def render_code(code, language, code_style, font_size):
+    """Kod bloğunu pygments varsa renklendirerek HTML'e çevirir"""
+    pre_style = f"font-family: monospace; font-size: {max(8, font_size - 1)}px;"
+    if highlight is not None:
+        try:
+            lexer = get_lexer_by_name(language) if language else guess_lexer(code)
+            formatter = HtmlFormatter(noclasses=True, style=code_style, prestyles=pre_style)
+            return highlight(code, lexer, formatter)
+        except ClassNotFound:
+            pass
+        except Exception as e:
+            logger.warning(f"Kod renklendirilemedi: {str(e)}")
+    return f"<pre style=\"{pre_style}\">{html.escape(code, quote=False)}</pre>"
+
+
+def render_text_block(text):
+    """Kod dışındaki Markdown: başlıklar, listeler, alıntılar ve paragraflar"""
+    parts = []
+    paragraph = []
+    list_tag = None
+
+    def flush_paragraph():
+        if paragraph:
+            parts.append("<p>" + "<br>".join(render_inline(line) for line in paragraph) + "</p>")
+            paragraph.clear()
+
+    def close_list():
+        nonlocal list_tag
+        if list_tag:
+            parts.append(f"</{list_tag}>")
+            list_tag = None
+
+    for line in text.split("\n"):
+        heading = HEADING_RE.match(line)
+        bullet = BULLET_RE.match(line)
+        ordered = ORDERED_RE.match(line)
+        if heading:
+            flush_paragraph()
+            close_list()
+            level = min(6, len(heading.group(1)) + 2)
+            parts.append(f"<h{level}>{render_inline(heading.group(2))}</h{level}>")
+        elif bullet or ordered:
+            flush_paragraph()
+            tag = "ul" if bullet else "ol"
+            if list_tag != tag:
+                close_list()
+                parts.append(f"<{tag}>")
+                list_tag = tag
+            parts.append(f"<li>{render_inline((bullet or ordered).group(1))}</li>")
+        elif line.startswith(">"):
+            flush_paragraph()
+            close_list()
+            parts.append(f"<blockquote><i>{render_inline(line.lstrip('> '))}</i></blockquote>")
+        elif not line.strip():
+            flush_paragraph()
+            close_list()
+        else:
+            close_list()
+            paragraph.append(line)
+    flush_paragraph()
+    close_list()
+    return "".join(parts)
+
+
+def render_markdown(text, theme="dark", font_size=12):
+    """Markdown metnini QTextDocument'in desteklediği HTML'e çevirir"""
+    code_style = CODE_STYLES.get(theme, DEFAULT_CODE_STYLE)
+    parts = []
+    position = 0
+    for match in FENCE_RE.finditer(text):
+        parts.append(render_text_block(text[position:match.start()]))
+        parts.append(render_code(match.group(2), match.group(1), code_style, font_size))
+        position = match.end()
+    parts.append(render_text_block(text[position:]))
+    return "".join(parts)
+
+
+class MessageRenderer(QObject):
+    """Mesaj HTML'ini (mesaj özeti, tema, yazı tipi) anahtarıyla sınırlı LRU'da saklar.
+
+    Kısa mesajlar hemen işlenir; kod bloğu içeren veya uzun mesajlar için
+    önce düz metin döndürülür, arka plandaki sonuç hazır olunca mesajın
+    anahtarıyla `updated` sinyali yayılır ve yalnızca o mesaj yeniden çizilir.
+    """
+
+    updated = pyqtSignal(object)  # işlenmesi biten mesajın anahtarı
+    # Arka plan iş parçacığından gelen sonuç; Qt bunu ana iş parçacığına kuyruklar
+    rendered = pyqtSignal(object, str)
+
+    def __init__(self, max_entries=DEFAULT_RENDER_ENTRIES, parent=None):
+        super().__init__(parent)
+        self.max_entries = max_entries
+        self.cache = OrderedDict()
+        self.pending = set()
+        self.theme = "dark"
+        self.font = ("", 12)
+        self.hits = 0
+        self.misses = 0
+        self.jobs = queue.Queue()
+        self.rendered.connect(self.store_rendered)
+        self.worker = threading.Thread(target=self._worker, name="MessageRenderer", daemon=True)
+        self.worker.start()
+
+    def set_style(self, theme=None, font_family=None, font_size=None):
+        """Tema/yazı tipi değiştiyse True döndürür; eski girdiler LRU ile düşer"""
+        theme = theme or self.theme
+        font = (font_family or self.font[0], font_size or self.font[1])
+        changed = (theme, font) != (self.theme, self.font)
+        self.theme = theme
+        self.font = font
+        return changed
+
+    def make_key(self, text):
+        digest = hashlib.sha1(text.encode("utf-8", errors="replace")).hexdigest()
+        return (digest, self.theme, self.font)
+
+    def render(self, text):
+        """Mesajın HTML gövdesi; ağır mesaj ilk kez istendiğinde geçici düz metin döner"""
+        key = self.make_key(text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return cached
+        self.misses += 1
+        if not is_heavy(text):
+            rendered = render_markdown(text, self.theme, self.font[1])
+            self.remember(key, rendered)
+            return rendered
+        if key not in self.pending:
+            self.pending.add(key)
+            self.jobs.put((key, text, self.theme, self.font[1]))
+        return plain_html(text)
+
+    def is_pending(self, text):
+        """Mesaj arka planda işleniyor mu (şu an düz metin olarak mı gösteriliyor)"""
+        return self.make_key(text) in self.pending
+
+    def remember(self, key, rendered):
+        self.cache[key] = rendered
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)
+
+    def store_rendered(self, key, rendered):
+        self.pending.discard(key)
+        self.remember(key, rendered)
+        self.updated.emit(key)
+
+    def _worker(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            key, text, theme, font_size = job
+            try:
+                self.rendered.emit(key, render_markdown(text, theme, font_size))
+            except Exception as e:
+                logger.error(f"Mesaj arka planda işlenirken hata: {str(e)}")
+                self.rendered.emit(key, plain_html(text))
+
+    def close(self):
+        self.jobs.put(None)
+        self.worker.join(timeout=2)
@@ -0,0 +1,152 @@
+import time
+import hashlib
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+
+logger = logging.getLogger('DeepSeekChat.rate_limiter')
+
+# OpenRouter ücretsiz modelleri için varsayılan sınırlar (dakikada istek)
+DEFAULT_KEY_RATE = 20
+DEFAULT_MODEL_RATE = 20
+
+
+def parse_retry_after(value, now=None):
+    """Retry-After başlığını (saniye veya HTTP tarihi) bekleme süresine çevirir"""
+    if not value:
+        return None
+    now = now or time.time()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_reset(value, now=None):
+    """X-RateLimit-Reset değerini (ms/sn epoch veya saniye) bekleme süresine çevirir"""
+    if not value:
+        return None
+    now = now or time.time()
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    if reset > 1e12:
+        reset /= 1000.0
+    if reset > 1e9:
+        return max(0.0, reset - now)
+    return max(0.0, reset)
+
+
+class TokenBucket:
+    """Sırayla bekleyen istekleri destekleyen jeton kovası"""
+
+    def __init__(self, rate_per_minute, capacity=None, now=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = float(self.capacity)
+        # Çağıranın saatiyle başlar; yoksa ilk ayırma sıfırdan büyük bekleme bildirir
+        self.updated = time.monotonic() if now is None else now
+        self.blocked_until = 0.0
+
+    def _refill(self, now):
+        # Engel süresince dolum durur; updated o zamana kadar ileridedir
+        if now <= self.updated:
+            return
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now):
+        """Bir jeton ayırır; (bekleme süresi, sıradaki yeri) döndürür"""
+        self._refill(now)
+        self.tokens -= 1
+        # Eksik jetonlar dolumun yeniden başladığı andan itibaren birer birer gelir
+        refill_start = max(now, self.updated)
+        wait = max(0.0, refill_start - now + max(0.0, -self.tokens) / self.rate, self.blocked_until - now)
+        position = max(0, int(-self.tokens + 0.999))
+        return wait, position
+
+    def block_for(self, seconds, now):
+        """Sunucu bildirdiği süre boyunca yeni jeton verilmesini durdurur"""
+        self._refill(now)
+        self.blocked_until = max(self.blocked_until, now + seconds)
+        # Engel kalktığında en fazla bir istek hemen geçebilir, sonrakiler hız sınırıyla gelir
+        self.tokens = min(self.tokens, 1.0)
+        self.updated = max(self.updated, self.blocked_until)
+
+    def sync_remaining(self, remaining, now):
+        """Sunucunun bildirdiği kalan istek sayısıyla jetonları hizalar"""
+        self._refill(now)
+        self.tokens = min(self.tokens, float(remaining))
+
+
+class RateLimiter:
+    """API anahtarı ve model başına istemci tarafı hız sınırlayıcı"""
+
+    def __init__(self, key_rate=DEFAULT_KEY_RATE, model_rate=DEFAULT_MODEL_RATE):
+        self.key_rate = key_rate
+        self.model_rate = model_rate
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def _bucket(self, kind, name, now):
+        key = (kind, name)
+        if key not in self.buckets:
+            rate = self.key_rate if kind == "key" else self.model_rate
+            self.buckets[key] = TokenBucket(rate, now=now)
+        return self.buckets[key]
+
+    @staticmethod
+    def _key_id(api_key):
+        # Anahtarın kendisi bellekte tutulan sözlükte anahtar olarak saklanmaz
+        return hashlib.sha256((api_key or "").encode()).hexdigest()[:16]
+
+    def acquire(self, api_key, model):
+        """İstek hakkı ayırır; (bekleme süresi, sıradaki yeri) döndürür"""
+        now = time.monotonic()
+        with self.lock:
+            key_wait, key_position = self._bucket("key", self._key_id(api_key), now).reserve(now)
+            model_wait, model_position = self._bucket("model", model, now).reserve(now)
+        return max(key_wait, model_wait), max(key_position, model_position)
+
+    def feedback(self, api_key, model, status_code, headers):
+        """Yanıt başlıklarındaki sınır bilgisini kovalara işler"""
+        now = time.monotonic()
+        with self.lock:
+            key_bucket = self._bucket("key", self._key_id(api_key), now)
+            remaining = headers.get("X-RateLimit-Remaining")
+            if remaining is not None:
+                try:
+                    key_bucket.sync_remaining(int(remaining), now)
+                except ValueError:
+                    pass
+                if remaining == "0":
+                    reset = parse_reset(headers.get("X-RateLimit-Reset"))
+                    if reset:
+                        key_bucket.block_for(reset, now)
+
+            if status_code == 429:
+                wait = parse_retry_after(headers.get("Retry-After"))
+                if wait is None:
+                    wait = parse_reset(headers.get("X-RateLimit-Reset")) or 60.0 / self.model_rate
+                self._bucket("model", model, now).block_for(wait, now)
+                logger.warning(f"429 alındı, {model} {wait:.1f} sn bekletilecek")
+                return wait
+        return None
+
+
+_limiter = None
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter():
+    """Süreç genelinde paylaşılan RateLimiter örneğini döndürür"""
+    global _limiter
+    with _limiter_lock:
+        if _limiter is None:
+            _limiter = RateLimiter()
+        return _limiter
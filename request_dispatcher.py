@@ -0,0 +1,123 @@
+import time
+import logging
+from collections import deque
+from PyQt6.QtCore import QObject, pyqtSignal
+
+logger = logging.getLogger('DeepSeekChat.dispatcher')
+
+DEFAULT_MAX_CONCURRENT = 4
+
+
+class RequestDispatcher(QObject):
+    """Sohbet başına tek istek, tüm sohbetler için ortak eşzamanlılık sınırı uygular"""
+
+    duplicate_dropped = pyqtSignal(str, int)  # sohbet ID, toplam düşürülen istek
+    request_blocked = pyqtSignal(str)  # sohbet ID; yanıt beklenirken farklı bir mesaj gönderilmek istendi
+    request_finished = pyqtSignal(str)  # sohbet ID
+    pending_changed = pyqtSignal(str, str)  # sohbet ID, durum: "queued" / "running" / ""
+
+    # Aynı mesajın bu süre içinde tekrar gönderilmesi çift tıklama sayılır
+    COALESCE_WINDOW = 1.0
+
+    def __init__(self, parent=None, max_concurrent=DEFAULT_MAX_CONCURRENT):
+        super().__init__(parent)
+        self.max_concurrent = max(1, max_concurrent)
+        self.in_flight = {}
+        self.queue = deque()
+        self.running = set()
+        self.last_submit = {}
+        self.dropped_count = 0
+
+    def is_busy(self, chat_id):
+        """Sohbette yanıtı beklenen bir istek var mı"""
+        return chat_id in self.in_flight
+
+    def set_max_concurrent(self, max_concurrent):
+        """Eşzamanlı istek sınırını değiştirir ve boşalan yerlere sıradakileri alır"""
+        self.max_concurrent = max(1, max_concurrent)
+        self._start_queued()
+
+    def try_acquire(self, chat_id, fingerprint):
+        """Sohbet için yeni istek hakkı ayırır; yineleniyorsa veya yanıt bekleniyorsa False döner"""
+        now = time.monotonic()
+        last = self.last_submit.get(chat_id)
+        busy = chat_id in self.in_flight
+        same = last is not None and last[0] == fingerprint
+        if same and (busy or now - last[1] < self.COALESCE_WINDOW):
+            self.dropped_count += 1
+            logger.info(f"Yinelenen istek düşürüldü: {chat_id} (toplam {self.dropped_count})")
+            self.duplicate_dropped.emit(chat_id, self.dropped_count)
+            return False
+        if busy:
+            # Farklı mesaj birleştirilmez; kullanıcı yanıt gelince yeniden gönderir
+            logger.info(f"Yanıt beklenirken yeni istek gönderilmedi: {chat_id}")
+            self.request_blocked.emit(chat_id)
+            return False
+
+        self.in_flight[chat_id] = None
+        self.last_submit[chat_id] = (fingerprint, now)
+        return True
+
+    def start(self, chat_id, worker):
+        """İş parçacığını sınır müsaitse başlatır, değilse sıraya koyar"""
+        self.in_flight[chat_id] = worker
+        worker.finished.connect(lambda: self.release(chat_id, worker))
+        self.queue.append(chat_id)
+        self.pending_changed.emit(chat_id, "queued")
+        self._start_queued()
+
+    def queue_position(self, chat_id):
+        """Sohbetin bekleme sırasındaki yeri (1'den başlar), sırada değilse 0"""
+        try:
+            return self.queue.index(chat_id) + 1
+        except ValueError:
+            return 0
+
+    def cancel(self, chat_id):
+        """Sohbetin isteğini durdurur; sıradaysa hiç başlatılmadan çıkarılır"""
+        worker = self.in_flight.get(chat_id)
+        if worker is None:
+            return False
+        if chat_id in self.running:
+            worker.cancel()
+        else:
+            self.release(chat_id, worker)
+        logger.info(f"İstek durduruldu: {chat_id}")
+        return True
+
+    def cancel_all(self):
+        """Tüm istekleri durdurur; sıradakiler başlatılmaz. Durması beklenecek iş parçacıklarını döndürür"""
+        # Sıra önce boşaltılır ki serbest kalan yerlere yeni istek başlamasın
+        self.queue.clear()
+        running = []
+        for chat_id, worker in list(self.in_flight.items()):
+            if worker is None:
+                continue
+            if chat_id in self.running:
+                worker.cancel()
+                running.append(worker)
+            else:
+                self.release(chat_id, worker)
+        if self.in_flight:
+            logger.info(f"Tüm istekler durduruldu ({len(running)} çalışan)")
+        return running
+
+    def release(self, chat_id, worker=None):
+        """Sohbetin istek hakkını serbest bırakır; worker verilmezse yalnızca ayrılmış hakkı"""
+        if chat_id not in self.in_flight or self.in_flight[chat_id] is not worker:
+            return
+        del self.in_flight[chat_id]
+        self.running.discard(chat_id)
+        if chat_id in self.queue:
+            self.queue.remove(chat_id)
+        self.pending_changed.emit(chat_id, "")
+        self.request_finished.emit(chat_id)
+        self._start_queued()
+
+    def _start_queued(self):
+        while self.queue and len(self.running) < self.max_concurrent:
+            chat_id = self.queue.popleft()
+            self.running.add(chat_id)
+            self.pending_changed.emit(chat_id, "running")
+            self.in_flight[chat_id].start()
+            logger.info(f"İstek başlatıldı: {chat_id} ({len(self.running)}/{self.max_concurrent})")
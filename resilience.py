@@ -0,0 +1,85 @@
+import time
+import random
+import logging
+import threading
+
+logger = logging.getLogger('DeepSeekChat.resilience')
+
+
+class RetryPolicy:
+    """5xx ve zaman aşımı hataları için sınırlı, jitter'lı üstel geri çekilme"""
+
+    RETRYABLE_STATUS = {408, 500, 502, 503, 504}
+
+    def __init__(self, max_retries=2, base_delay=1.0, max_delay=16.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def is_retryable(self, status_code):
+        """HTTP durum kodu tekrar denemeye uygun mu"""
+        return status_code in self.RETRYABLE_STATUS or status_code >= 500
+
+    def delay(self, attempt):
+        """attempt. tekrar öncesi beklenecek süre (full jitter)"""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Art arda hata veren modeli bir süre devre dışı bırakan devre kesici"""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.lock = threading.Lock()
+
+    def allow_request(self):
+        """İstek gönderilebilir mi; süre dolduysa tek bir deneme isteğine izin verir"""
+        with self.lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                logger.info(f"Devre yarı açık, deneme isteği: {self.name}")
+                return True
+            return False
+
+    def is_open(self):
+        with self.lock:
+            return self.state == self.OPEN
+
+    def record_success(self):
+        with self.lock:
+            if self.state != self.CLOSED:
+                logger.info(f"Devre kapandı: {self.name}")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(f"Devre açıldı: {self.name} ({self.failures} hata)")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(model):
+    """Model için süreç genelinde paylaşılan devre kesiciyi döndürür"""
+    with _breakers_lock:
+        if model not in _breakers:
+            _breakers[model] = CircuitBreaker(model)
+        return _breakers[model]
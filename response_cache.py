@@ -0,0 +1,143 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger('DeepSeekChat.response_cache')
+
+DEFAULT_CACHE_DIR = "response_cache"
+DEFAULT_MEMORY_ENTRIES = 128
+DEFAULT_MAX_DISK_BYTES = 50 * 1024 * 1024
+DEFAULT_TTL = 7 * 24 * 3600
+
+
+class ResponseCache:
+    """API yanıtlarını istek gövdesinin özetine göre saklayan iki katmanlı önbellek"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, memory_entries=DEFAULT_MEMORY_ENTRIES,
+                 max_disk_bytes=DEFAULT_MAX_DISK_BYTES, ttl=DEFAULT_TTL):
+        self.cache_dir = cache_dir
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl = ttl
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.disk_bytes = sum(size for _, _, size in self._disk_entries())
+
+    @staticmethod
+    def make_key(payload):
+        """İstek gövdesinden anahtar üretir; stream bayrağı içeriği değiştirmediği için dahil edilmez"""
+        data = {k: v for k, v in payload.items() if k != "stream"}
+        encoded = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+        return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        """Önbellekteki yanıtı döndürür, yoksa veya süresi dolmuşsa None"""
+        now = time.time()
+        with self.lock:
+            entry = self.memory.get(key)
+            if entry is not None:
+                if now - entry[1] <= self.ttl:
+                    self.memory.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self.memory[key]
+
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    record = json.load(f)
+            except (OSError, ValueError):
+                self.misses += 1
+                return None
+
+            if now - record["created"] > self.ttl:
+                self._remove_file(path)
+                self.misses += 1
+                return None
+
+            # Diskten okunan kayıt bellek katmanına alınır, eviction için zamanı yenilenir
+            os.utime(path)
+            self._remember(key, record["content"], record["created"])
+            self.hits += 1
+            return record["content"]
+
+    def put(self, key, content):
+        """Yanıtı bellek ve disk katmanlarına yazar"""
+        created = time.time()
+        with self.lock:
+            self._remember(key, content, created)
+            path = self._path(key)
+            tmp_path = path + ".tmp"
+            try:
+                old_size = os.path.getsize(path) if os.path.exists(path) else 0
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump({"created": created, "content": content}, f, ensure_ascii=False)
+                os.replace(tmp_path, path)
+                self.disk_bytes += os.path.getsize(path) - old_size
+            except OSError as e:
+                logger.error(f"Önbelleğe yazılırken hata: {str(e)}")
+                return
+            if self.disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def clear(self):
+        """Tüm önbelleği temizler"""
+        with self.lock:
+            self.memory.clear()
+            for path, _, _ in self._disk_entries():
+                self._remove_file(path)
+            self.disk_bytes = 0
+
+    def _remember(self, key, content, created):
+        self.memory[key] = (content, created)
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_entries:
+            self.memory.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _disk_entries(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_mtime, stat.st_size))
+        return entries
+
+    def _remove_file(self, path):
+        try:
+            self.disk_bytes -= os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _evict_disk(self):
+        """Süresi dolanları, ardından en eski kullanılanları sınırın altına inene kadar siler"""
+        now = time.time()
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[1])
+        total = sum(size for _, _, size in entries)
+        removed = 0
+        for path, mtime, size in entries:
+            if total <= self.max_disk_bytes * 0.9 and now - mtime <= self.ttl:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        self.disk_bytes = total
+        logger.info(f"Önbellekten {removed} kayıt silindi ({total} bayt kaldı)")
@@ -0,0 +1,56 @@
+from .base import ChatStore
+from .journal import StateJournal
+from .sqlite_store import SQLiteStore
+from .sharded_store import ShardedStore
+from .migrate import migrate_json_state, MigrationError
+from .saver import BackgroundSaver
+from .chat_cache import ChatCache
+from .archive import ChatArchive
+from .models import Message, Chat, Sender
+from .serializers import get_serializer, available_serializers, load_file, dump_file
+
+
+def open_store(backend="sqlite", serializer="auto", progress=None, migrate=True):
+    """Seçilen depolama arka ucunu açar; SQLite ve parçalı depo ilk açılışta JSON durumunu içe aktarır.
+
+    serializer ("auto", "json", "orjson", "msgpack") parçalı deponun dizin
+    dosyası için kullanılır; okurken biçim otomatik algılanır. Aktarma
+    başarısız olursa depo kapatılır ve MigrationError fırlatılır; kaynak
+    dosyalar bir sonraki açılışta yeniden denenmek üzere bırakılır.
+    """
+    if backend == "journal":
+        return StateJournal()
+    if backend == "sqlite":
+        store = SQLiteStore()
+    elif backend == "sharded":
+        store = ShardedStore(serializer=serializer)
+    else:
+        raise ValueError(f"Bilinmeyen depolama türü: {backend}")
+    if migrate and store.is_empty():
+        try:
+            migrate_json_state(store, progress=progress)
+        except MigrationError:
+            store.close()
+            raise
+    return store
+
+
+__all__ = [
+    'ChatStore',
+    'StateJournal',
+    'SQLiteStore',
+    'ShardedStore',
+    'migrate_json_state',
+    'MigrationError',
+    'BackgroundSaver',
+    'ChatCache',
+    'ChatArchive',
+    'Message',
+    'Chat',
+    'Sender',
+    'get_serializer',
+    'available_serializers',
+    'load_file',
+    'dump_file',
+    'open_store'
+]
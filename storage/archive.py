@@ -0,0 +1,89 @@
+import os
+import gzip
+import time
+import logging
+import threading
+from .serializers import get_serializer, load_file, dump_file
+
+try:
+    import zstandard
+except ImportError:  # zstd isteğe bağlıdır, yoksa gzip kullanılır
+    zstandard = None
+
+logger = logging.getLogger('DeepSeekChat.storage.archive')
+
+ARCHIVE_DIR = "archive"
+INDEX_FILE = "index.json"
+ZSTD_LEVEL = 10
+GZIP_LEVEL = 9
+
+
+class ChatArchive:
+    """Uzun süre açılmayan sohbetleri sohbet başına sıkıştırılmış dosyalarda saklar.
+
+    Dosyalar zstandard kuruluysa .zst, değilse .gz olarak yazılır; okurken
+    uzantıya göre açılır. index.json arşivdeki sohbetlerin başlıklarını ve
+    arşivlenme zamanlarını tutar, böylece kenar çubuğu dosyaları açmadan dolar.
+    """
+
+    def __init__(self, root=ARCHIVE_DIR):
+        self.root = root
+        self.index_path = os.path.join(root, INDEX_FILE)
+        self.codec = get_serializer("auto")
+        self.lock = threading.RLock()
+        self.entries = {}
+        os.makedirs(root, exist_ok=True)
+        if os.path.exists(self.index_path):
+            self.entries = load_file(self.index_path)
+
+    def __contains__(self, chat_id):
+        with self.lock:
+            return chat_id in self.entries
+
+    def titles(self):
+        """(sohbet_id, başlık) çiftleri, en son arşivlenen önce"""
+        with self.lock:
+            ordered = sorted(self.entries.items(), key=lambda entry: entry[1]["archived_at"], reverse=True)
+            return [(chat_id, entry["title"]) for chat_id, entry in ordered]
+
+    def add(self, chat_id, title, messages):
+        """Sohbeti sıkıştırıp arşive yazar"""
+        data = self.codec.dumps({"title": title, "messages": messages})
+        if zstandard is not None:
+            file_name, blob = f"{chat_id}.json.zst", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+        else:
+            file_name, blob = f"{chat_id}.json.gz", gzip.compress(data, GZIP_LEVEL)
+
+        path = os.path.join(self.root, file_name)
+        with open(path + ".tmp", "wb") as f:
+            f.write(blob)
+        os.replace(path + ".tmp", path)
+        with self.lock:
+            self.entries[chat_id] = {"title": title, "file": file_name, "archived_at": int(time.time())}
+            dump_file(self.entries, self.index_path)
+        logger.info(f"Sohbet arşivlendi: {chat_id} ({len(data)} → {len(blob)} bayt)")
+
+    def load(self, chat_id):
+        """Arşivdeki sohbetin mesajlarını açar"""
+        with self.lock:
+            file_name = self.entries[chat_id]["file"]
+        with open(os.path.join(self.root, file_name), "rb") as f:
+            blob = f.read()
+        if file_name.endswith(".zst"):
+            if zstandard is None:
+                raise RuntimeError("Bu arşiv dosyası için 'zstandard' paketi kurulu olmalı")
+            data = zstandard.ZstdDecompressor().decompress(blob)
+        else:
+            data = gzip.decompress(blob)
+        return self.codec.loads(data).get("messages", [])
+
+    def remove(self, chat_id):
+        """Sohbeti arşivden siler"""
+        with self.lock:
+            entry = self.entries.pop(chat_id, None)
+            if entry is None:
+                return
+            dump_file(self.entries, self.index_path)
+        path = os.path.join(self.root, entry["file"])
+        if os.path.exists(path):
+            os.remove(path)
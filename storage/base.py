@@ -0,0 +1,83 @@
+from contextlib import contextmanager
+
+
+class ChatStore:
+    """MainApplication'ın sohbet verisini okuyup yazdığı depolama arayüzü.
+
+    load_state, save_app_state'in ürettiği sözlük biçiminde durumu
+    ("chats", "projects", ayarlar ve "chat_data") döndürür. Yazma işlemleri
+    tek bir mesaj, sohbet başlığı veya düzen/ayar değişikliği düzeyindedir.
+
+    lazy_loading destekleyen depolar load_state(messages=False) ile yalnızca
+    başlıkları döndürür; mesajlar sohbet açıldığında load_chat ile okunur.
+    Uzun sohbetler load_page ile sondan başa doğru sayfa sayfa okunabilir.
+    """
+
+    lazy_loading = False
+
+    def load_state(self, messages=True):
+        raise NotImplementedError
+
+    def load_chat(self, chat_id):
+        """Tek bir sohbetin mesajlarını döndürür"""
+        raise NotImplementedError
+
+    def load_page(self, chat_id, before=None, limit=None):
+        """`before` sırasından (yoksa sondan) önceki en fazla `limit` mesajı döndürür.
+
+        (ilk mesajın sohbetteki sırası, mesajlar) çifti döner; sıra 0 ise
+        daha eski mesaj kalmamıştır. Varsayılan uygulama tüm sohbeti okur.
+        """
+        messages = self.load_chat(chat_id)
+        end = len(messages) if before is None else min(before, len(messages))
+        start = 0 if limit is None else max(0, end - limit)
+        return start, messages[start:end]
+
+    def add_message(self, chat_id, message):
+        raise NotImplementedError
+
+    def save_chat(self, chat_id, title):
+        raise NotImplementedError
+
+    def delete_chat(self, chat_id):
+        raise NotImplementedError
+
+    def save_state(self, state):
+        """Sohbet listesi, proje ağacı ve ayarları kaydeder"""
+        raise NotImplementedError
+
+    def idle_chats(self, before):
+        """Son mesajı before (epoch saniye) tarihinden eski olan sohbetlerin kimlikleri"""
+        return []
+
+    def import_chat(self, chat_id, title, messages, updated_at=None):
+        """Bir sohbeti tüm mesajlarıyla depoya aktarır.
+
+        updated_at (ISO) sohbetin son etkinlik zamanıdır; verilmezse son
+        mesajın zamanı kullanılır, böylece eski sohbetler arşivlenebilir.
+        """
+        self.save_chat(chat_id, title)
+        for message in messages:
+            self.add_message(chat_id, message)
+
+    def import_state(self, state):
+        """Tam bir durum sözlüğünü (chat_data dahil) depoya aktarır"""
+        with self.transaction():
+            for chat_id, chat in state.get("chat_data", {}).items():
+                self.import_chat(chat_id, chat.get("title", ""), chat.get("messages", []))
+            self.save_state({k: v for k, v in state.items() if k != "chat_data"})
+
+    @contextmanager
+    def transaction(self):
+        """Bir grup yazmayı tek işlem olarak uygular (destekleniyorsa)"""
+        yield
+
+    def compact(self):
+        """Arka plan bakımı (sıkıştırma vb.); gerekmiyorsa bir şey yapmaz"""
+
+    def flush(self):
+        """Bekleyen yazmaları diske işler"""
+
+    def close(self):
+        """Depoyu kapatır"""
+        self.flush()
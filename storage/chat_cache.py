@@ -0,0 +1,117 @@
+import logging
+from collections import OrderedDict
+from .models import Chat, Message
+
+logger = logging.getLogger('DeepSeekChat.storage.cache')
+
+# Mesajları bellekte tutulan en fazla sohbet sayısı
+RESIDENT_CHATS = 32
+
+
+class ChatCache:
+    """chat_data için sözlük benzeri, tembel yüklemeli sohbet önbelleği.
+
+    Tüm sohbetlerin başlıkları her zaman bellektedir; mesajlar ilk erişimde
+    loader ile depodan okunur ve en son kullanılan RESIDENT_CHATS sohbet
+    dışındakiler bellekten atılır. loader veya capacity verilmezse hiçbir
+    şey atılmaz.
+
+    pager verilirse (chat_id, before, limit) -> (sıra, mesajlar) ile ilk
+    erişimde yalnızca son page_size mesaj okunur; eski sayfalar load_older
+    ile istendikçe başa eklenir.
+    """
+
+    def __init__(self, loader=None, capacity=RESIDENT_CHATS, pager=None, page_size=None):
+        self.loader = loader
+        self.capacity = capacity
+        self.pager = pager
+        self.page_size = page_size
+        self.chats = {}
+        self.resident = OrderedDict()
+        self.loads = 0
+        self.evictions = 0
+
+    def add(self, chat_id, data):
+        """Depodan gelen kaydı ekler; mesajsız kayıtlar ilk erişimde yüklenir"""
+        self.chats[chat_id] = Chat.from_dict(data)
+
+    def is_loaded(self, chat_id):
+        chat = self.chats.get(chat_id)
+        return chat is not None and chat.messages is not None
+
+    def __contains__(self, chat_id):
+        return chat_id in self.chats
+
+    def __len__(self):
+        return len(self.chats)
+
+    def __iter__(self):
+        return iter(self.chats)
+
+    def __getitem__(self, chat_id):
+        chat = self.chats[chat_id]
+        if chat.messages is None:
+            if self.pager is not None:
+                chat.offset, messages = self.pager(chat_id, None, self.page_size)
+            else:
+                messages = self.loader(chat_id) if self.loader else []
+                chat.offset = 0
+            chat.messages = [Message.from_dict(m) for m in messages]
+            self.loads += 1
+            logger.debug(f"Sohbet mesajları yüklendi: {chat_id} ({len(chat.messages)} mesaj)")
+        self._touch(chat_id)
+        return chat
+
+    def __setitem__(self, chat_id, chat):
+        self.chats[chat_id] = chat
+        self._touch(chat_id)
+
+    def __delitem__(self, chat_id):
+        del self.chats[chat_id]
+        self.resident.pop(chat_id, None)
+
+    def get(self, chat_id, default=None):
+        if chat_id not in self.chats:
+            return default
+        return self[chat_id]
+
+    def load_older(self, chat_id, limit=None):
+        """Sohbetin bir önceki sayfasını başa ekler ve eklenen mesajları döndürür"""
+        chat = self[chat_id]
+        if not chat.offset or self.pager is None:
+            return []
+        chat.offset, page = self.pager(chat_id, chat.offset, limit or self.page_size)
+        older = [Message.from_dict(m) for m in page]
+        chat.messages[:0] = older
+        logger.debug(f"Eski mesajlar yüklendi: {chat_id} ({len(older)} mesaj, {chat.offset} kaldı)")
+        return older
+
+    def complete(self, chat_id):
+        """Sohbetin tüm mesajlarını yükleyip döndürür (dışa aktarma, arşivleme)"""
+        chat = self[chat_id]
+        if chat.offset:
+            self.load_older(chat_id, chat.offset)
+        return chat
+
+    def title(self, chat_id, default=""):
+        """Mesajları yüklemeden başlığı döndürür"""
+        chat = self.chats.get(chat_id)
+        return chat.title if chat is not None else default
+
+    def set_title(self, chat_id, title):
+        """Mesajları yüklemeden başlığı günceller"""
+        if chat_id in self.chats:
+            self.chats[chat_id].title = title
+        else:
+            self.chats[chat_id] = Chat(title)
+
+    def _touch(self, chat_id):
+        self.resident[chat_id] = True
+        self.resident.move_to_end(chat_id)
+        if self.loader is None or self.capacity is None:
+            return
+        while len(self.resident) > self.capacity:
+            cold_id, _ = self.resident.popitem(last=False)
+            if cold_id in self.chats:
+                self.chats[cold_id].messages = None
+            self.evictions += 1
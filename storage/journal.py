@@ -0,0 +1,260 @@
+import os
+import logging
+import threading
+from .base import ChatStore
+from .serializers import get_serializer, load_file
+
+logger = logging.getLogger('DeepSeekChat.storage.journal')
+
+SNAPSHOT_FILE = "app_state.json"
+JOURNAL_FILE = "app_state.journal"
+
+# Günlük satırları ve anlık görüntü, kurulu en hızlı JSON kodlayıcıyla yazılır
+_codec = get_serializer("auto")
+
+# Bu kadar kayıt birikince arka planda anlık görüntüye sıkıştırılır
+COMPACT_EVERY = 500
+
+
+def apply_record(state, record):
+    """Tek bir günlük kaydını durum sözlüğüne uygular"""
+    op = record.get("op")
+    chat_data = state.setdefault("chat_data", {})
+    chat_id = record.get("chat_id")
+
+    if op == "message":
+        chat = chat_data.setdefault(chat_id, {"title": "", "messages": []})
+        chat["messages"].append(record["message"])
+    elif op == "chat":
+        chat = chat_data.setdefault(chat_id, {"title": "", "messages": []})
+        chat["title"] = record["title"]
+    elif op == "delete":
+        chat_data.pop(chat_id, None)
+    elif op == "state":
+        state.update(record["state"])
+    else:
+        logger.warning(f"Bilinmeyen günlük kaydı atlandı: {op}")
+
+
+def replay(state, path, after_seq):
+    """Günlük dosyasındaki after_seq'ten yeni kayıtları uygular, son sıra numarasını döndürür"""
+    last_seq = after_seq
+    count = 0
+    if not os.path.exists(path):
+        return last_seq, count
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                record = _codec.loads(line)
+            except ValueError:
+                # Çökme anında yarım kalmış son satır
+                logger.warning(f"Bozuk günlük satırı atlandı: {path}")
+                continue
+            seq = record.get("seq", 0)
+            if seq <= after_seq:
+                continue
+            apply_record(state, record)
+            last_seq = max(last_seq, seq)
+            count += 1
+    return last_seq, count
+
+
+class SnapshotWriter:
+    """Anlık görüntüyü sohbet başına önbelleğe alınmış kodlanmış parçalardan yazar.
+
+    Günlük kayıtları yalnızca dokundukları sohbetleri kirli olarak işaretler;
+    yazarken kirli sohbetler yeniden kodlanır, diğerlerinin önceki baytları
+    olduğu gibi kullanılır.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.settings = {}
+        self.fragments = {}
+        self.dirty = {}
+        self.seq = 0
+        self.loaded = False
+        self.last_stats = {}
+
+    def load(self):
+        """Diskteki anlık görüntüyü okur; ilk yazmada tüm sohbetler kodlanır"""
+        state = {}
+        if os.path.exists(self.path):
+            state = load_file(self.path)
+        self.seq = state.pop("journal_seq", 0)
+        self.dirty = state.pop("chat_data", {})
+        self.fragments = {}
+        self.settings = state
+        self.loaded = True
+
+    def replay(self, path):
+        """Günlükteki yeni kayıtları uygular, uygulanan kayıt sayısını döndürür"""
+        work = {"chat_data": self.dirty}
+        count = 0
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    record = _codec.loads(line)
+                except ValueError:
+                    logger.warning(f"Bozuk günlük satırı atlandı: {path}")
+                    continue
+                seq = record.get("seq", 0)
+                if seq <= self.seq:
+                    continue
+                chat_id = record.get("chat_id")
+                if record.get("op") == "delete":
+                    self.fragments.pop(chat_id, None)
+                elif chat_id in self.fragments and chat_id not in self.dirty:
+                    self.dirty[chat_id] = _codec.loads(self.fragments[chat_id])
+                apply_record(work, record)
+                self.seq = seq
+                count += 1
+        work.pop("chat_data")
+        self.settings.update(work)
+        return count
+
+    def write(self):
+        """Kirli sohbetleri kodlar ve anlık görüntüyü atomik olarak yazar"""
+        rewritten_bytes = 0
+        for chat_id, chat in self.dirty.items():
+            fragment = _codec.dumps(chat)
+            self.fragments[chat_id] = fragment
+            rewritten_bytes += len(fragment)
+        self.last_stats = {
+            "chats_rewritten": len(self.dirty),
+            "chats_reused": len(self.fragments) - len(self.dirty),
+            "bytes_rewritten": rewritten_bytes
+        }
+        self.dirty = {}
+
+        parts = [_codec.dumps(key) + b":" + _codec.dumps(value) for key, value in self.settings.items()]
+        parts.append(b'"journal_seq":%d' % self.seq)
+        parts.append(b'"chat_data":{' + b",".join(
+            _codec.dumps(chat_id) + b":" + fragment for chat_id, fragment in self.fragments.items()
+        ) + b"}")
+
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(b"{" + b",".join(parts) + b"}")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        return self.last_stats
+
+
+class StateJournal(ChatStore):
+    """Sohbet durumunu anlık görüntü + yalnızca ekleme yapılan günlük olarak saklar.
+
+    Her mesaj, başlık değişikliği, silme ve düzen değişikliği günlüğe tek satır
+    olarak eklenir. Günlük büyüdükçe arka planda anlık görüntüye sıkıştırılır;
+    açılışta anlık görüntü okunup günlüğün kalanı yeniden oynatılır.
+    """
+
+    def __init__(self, snapshot_path=SNAPSHOT_FILE, journal_path=JOURNAL_FILE):
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.rotated_path = journal_path + ".1"
+        self.seq = 0
+        self.pending = 0
+        self.file = None
+        self.last_state = None
+        self.compaction = None
+        self.snapshot = SnapshotWriter(snapshot_path)
+
+    def load_state(self, messages=True):
+        """Anlık görüntüyü okur ve günlükteki kayıtları üzerine uygular (mesajlar her zaman dahil)"""
+        self.wait_for_compaction()
+        state = {}
+        if os.path.exists(self.snapshot_path):
+            state = load_file(self.snapshot_path)
+        base_seq = state.pop("journal_seq", 0)
+
+        seq, rotated_count = replay(state, self.rotated_path, base_seq)
+        self.seq, journal_count = replay(state, self.journal_path, seq)
+        self.pending = rotated_count + journal_count
+        logger.info(f"Durum yüklendi: anlık görüntü + {self.pending} günlük kaydı")
+        return state
+
+    def add_message(self, chat_id, message):
+        self.append({"op": "message", "chat_id": chat_id, "message": message})
+
+    def save_chat(self, chat_id, title):
+        self.append({"op": "chat", "chat_id": chat_id, "title": title})
+
+    def delete_chat(self, chat_id):
+        self.append({"op": "delete", "chat_id": chat_id})
+
+    def save_state(self, state):
+        """Sohbet listesi, proje ağacı ve ayarları kaydeder; değişmediyse yazmaz"""
+        if state == self.last_state:
+            return
+        self.last_state = state
+        self.append({"op": "state", "state": state})
+
+    def append(self, record):
+        """Kaydı günlüğün sonuna ekler"""
+        self.seq += 1
+        record["seq"] = self.seq
+        if self.file is None:
+            self.file = open(self.journal_path, "ab")
+        self.file.write(_codec.dumps(record) + b"\n")
+        self.file.flush()
+        self.pending += 1
+        if self.pending >= COMPACT_EVERY:
+            self.compact()
+
+    def compact(self):
+        """Günlüğü döndürür ve arka planda anlık görüntüye sıkıştırır"""
+        if self.pending == 0 or (self.compaction and self.compaction.is_alive()):
+            return
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+        if os.path.exists(self.rotated_path):
+            # Önceki sıkıştırma yarım kalmış; varsa yeni kayıtlar onun sonuna eklenir
+            if os.path.exists(self.journal_path):
+                with open(self.journal_path, "rb") as src, \
+                        open(self.rotated_path, "ab") as dst:
+                    dst.write(src.read())
+                os.remove(self.journal_path)
+        else:
+            os.replace(self.journal_path, self.rotated_path)
+        self.pending = 0
+
+        self.compaction = threading.Thread(target=self._compact_worker, name="journal-compaction")
+        self.compaction.start()
+
+    def _compact_worker(self):
+        try:
+            if not self.snapshot.loaded:
+                self.snapshot.load()
+            count = self.snapshot.replay(self.rotated_path)
+            stats = self.snapshot.write()
+            os.remove(self.rotated_path)
+            logger.info(
+                f"Günlük sıkıştırıldı: {count} kayıt, {stats['chats_rewritten']} sohbet "
+                f"({stats['bytes_rewritten']} bayt) yeniden yazıldı, {stats['chats_reused']} sohbet aynen kullanıldı"
+            )
+        except Exception as e:
+            # Önbellek diskle uyumsuz kalmış olabilir; sonraki sıkıştırma baştan okur
+            self.snapshot.loaded = False
+            logger.error(f"Günlük sıkıştırılırken hata: {str(e)}")
+
+    def wait_for_compaction(self):
+        if self.compaction is not None:
+            self.compaction.join()
+
+    def flush(self):
+        """Günlüğü diske zorla yazar"""
+        if self.file is not None:
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def close(self):
+        """Günlüğü kapatır, devam eden sıkıştırmayı bekler"""
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.wait_for_compaction()
@@ -0,0 +1,80 @@
+import os
+import logging
+from .journal import SNAPSHOT_FILE, JOURNAL_FILE
+from .serializers import get_serializer
+from .stream_import import iter_state, upgrade_state
+
+logger = logging.getLogger('DeepSeekChat.storage.migrate')
+
+
+class MigrationError(Exception):
+    """Eski durum dosyaları depoya aktarılamadı; kaynaklar olduğu gibi bırakıldı"""
+
+
+def _replay_journal(store, path, after_seq, settings, chat_titles):
+    """Günlük kayıtlarını doğrudan depoya uygular, son sıra numarasını döndürür"""
+    if not os.path.exists(path):
+        return after_seq
+    codec = get_serializer("auto")
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                record = codec.loads(line)
+            except ValueError:
+                logger.warning(f"Bozuk günlük satırı atlandı: {path}")
+                continue
+            seq = record.get("seq", 0)
+            if seq <= after_seq:
+                continue
+            op = record.get("op")
+            chat_id = record.get("chat_id")
+            if op == "message":
+                chat_titles.setdefault(chat_id, "")
+                store.add_message(chat_id, record["message"])
+            elif op == "chat":
+                chat_titles[chat_id] = record["title"]
+                store.save_chat(chat_id, record["title"])
+            elif op == "delete":
+                chat_titles.pop(chat_id, None)
+                store.delete_chat(chat_id)
+            elif op == "state":
+                settings.update(record["state"])
+            after_seq = seq
+    return after_seq
+
+
+def migrate_json_state(store, snapshot_path=SNAPSHOT_FILE, journal_path=JOURNAL_FILE, progress=None):
+    """app_state.json ve günlüğünü bir kez depoya aktarır, kaynakları .migrated olarak saklar.
+
+    Anlık görüntü akış halinde okunur ve sohbet sohbet aktarılır; bellekte
+    aynı anda yalnızca bir sohbet ve başlık listesi tutulur. progress(okunan,
+    toplam) bayt cinsinden ilerleme bildirir.
+    """
+    sources = [snapshot_path, journal_path + ".1", journal_path]
+    if not any(os.path.exists(path) for path in sources):
+        return False
+
+    settings = {}
+    chat_titles = {}
+    try:
+        with store.transaction():
+            if os.path.exists(snapshot_path):
+                for kind, key, value in iter_state(snapshot_path, progress):
+                    if kind == "chat":
+                        chat_titles[key] = value.get("title", "")
+                        store.import_chat(key, chat_titles[key], value.get("messages", []))
+                    else:
+                        settings[key] = value
+            seq = settings.pop("journal_seq", 0)
+            for path in sources[1:]:
+                seq = _replay_journal(store, path, seq, settings, chat_titles)
+            store.save_state(upgrade_state(settings, chat_titles))
+    except Exception as e:
+        raise MigrationError(str(e)) from e
+
+    for path in sources:
+        if os.path.exists(path):
+            os.replace(path, path + ".migrated")
+
+    logger.info(f"JSON durumu depoya aktarıldı: {len(chat_titles)} sohbet")
+    return True
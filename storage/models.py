@@ -0,0 +1,116 @@
+import sys
+import time
+from datetime import datetime
+from enum import IntEnum
+
+# Rol adları tek kopya olarak tutulur
+_ROLES = (sys.intern("user"), sys.intern("assistant"))
+
+
+class Sender(IntEnum):
+    USER = 0
+    ASSISTANT = 1
+
+    @property
+    def role(self):
+        return _ROLES[self]
+
+    @classmethod
+    def from_role(cls, role):
+        return cls.USER if role == "user" else cls.ASSISTANT
+
+
+def to_epoch(timestamp):
+    """ISO zaman damgasını (yerel saat) tamsayı epoch saniyeye çevirir"""
+    if timestamp is None or isinstance(timestamp, int):
+        return timestamp
+    return int(datetime.fromisoformat(timestamp).timestamp())
+
+
+def to_iso(epoch):
+    """Epoch saniyeyi kayıtlardaki ISO biçimine (yerel saat, saniye hassasiyeti) çevirir"""
+    if epoch is None:
+        return None
+    return datetime.fromtimestamp(epoch).isoformat(timespec="seconds")
+
+
+def last_activity(messages):
+    """Mesaj sözlüklerindeki en son zaman damgası (ISO), yoksa None"""
+    for message in reversed(messages):
+        if message.get("timestamp"):
+            return message["timestamp"]
+    return None
+
+
+class Message:
+    """Tek bir sohbet mesajı; sözlük yerine yuvalı (slotted) nesne olarak tutulur.
+
+    Kayıt biçimi {"sender", "message", "timestamp"} sözlüğüdür; to_dict ve
+    from_dict bu biçimle dönüşüm yapar. Tanınmayan gönderen değeri ekranda
+    asistan olarak gösterilir ama kayda aynen geri yazılır.
+    """
+
+    __slots__ = ("sender", "text", "timestamp", "stored_role")
+
+    def __init__(self, sender, text, timestamp=None, stored_role=None):
+        self.sender = sender
+        self.text = text
+        self.timestamp = timestamp
+        # Yalnızca kayıttaki gönderen Sender'a karşılık gelmiyorsa dolu
+        self.stored_role = stored_role
+
+    @classmethod
+    def now(cls, sender, text):
+        """Şu anki zamanla damgalanmış yeni mesaj"""
+        return cls(sender, text, int(time.time()))
+
+    @property
+    def role(self):
+        return self.sender.role
+
+    @classmethod
+    def from_dict(cls, data):
+        role = data["sender"]
+        stored_role = None if role in _ROLES else sys.intern(str(role))
+        return cls(Sender.from_role(role), data["message"], to_epoch(data.get("timestamp")), stored_role)
+
+    def to_dict(self):
+        return {
+            "sender": self.stored_role or self.sender.role,
+            "message": self.text,
+            "timestamp": to_iso(self.timestamp),
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, Message):
+            return NotImplemented
+        return (self.sender, self.text, self.timestamp, self.stored_role) == \
+            (other.sender, other.text, other.timestamp, other.stored_role)
+
+    def __repr__(self):
+        return f"Message({self.sender.name}, {self.text[:30]!r}, {self.timestamp})"
+
+
+class Chat:
+    """Sohbet başlığı ve mesajları; messages None ise mesajlar henüz yüklenmemiştir.
+
+    offset, depoda kalan ve henüz yüklenmemiş eski mesajların sayısıdır
+    (0 ise messages sohbetin tamamıdır).
+    """
+
+    __slots__ = ("title", "messages", "offset")
+
+    def __init__(self, title="", messages=None, offset=0):
+        self.title = title
+        self.messages = messages
+        self.offset = offset
+
+    @classmethod
+    def from_dict(cls, data):
+        messages = data.get("messages")
+        if messages is not None:
+            messages = [Message.from_dict(m) for m in messages]
+        return cls(data.get("title", ""), messages)
+
+    def to_dict(self):
+        return {"title": self.title, "messages": [m.to_dict() for m in self.messages or []]}
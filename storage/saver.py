@@ -0,0 +1,166 @@
+import time
+import logging
+import threading
+
+logger = logging.getLogger('DeepSeekChat.storage.saver')
+
+# Art arda gelen kayıtlar bu kadar sessizlik olana dek birleştirilir
+COALESCE_WINDOW = 0.25
+# Sürekli yazma olsa bile bekleyen kayıtlar en geç bu sürede diske iner
+MAX_DELAY = 2.0
+# Yazılamayan işlem bu kadar denenir; denemeler arası bekleme her seferinde artar
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 1.0
+
+
+class BackgroundSaver:
+    """Depo yazmalarını GUI iş parçacığı dışında, birleştirilmiş gruplar halinde yapar.
+
+    Mesaj, başlık ve silme işlemleri sırasıyla uygulanır; düzen/ayar durumu
+    için yalnızca en son gönderilen yazılır. Grup yazılamazsa işlemler tek
+    tek denenir, hatalı olanlar artan beklemeyle yeniden kuyruğa alınır ve
+    MAX_ATTEMPTS denemeden sonra `failed` listesine düşer.
+    """
+
+    def __init__(self, store, window=COALESCE_WINDOW, max_delay=MAX_DELAY):
+        self.store = store
+        self.window = window
+        self.max_delay = max_delay
+        self.ops = []
+        self.keyed = {}
+        self.first_dirty = None
+        self.last_dirty = None
+        self.retry_at = None
+        self.failed = []
+        self.running = True
+        self.batches = 0
+        self.cond = threading.Condition()
+        self.write_lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, name="state-saver", daemon=True)
+        self.thread.start()
+
+    def add_message(self, chat_id, message):
+        self.submit(self.store.add_message, chat_id, message)
+
+    def save_chat(self, chat_id, title):
+        self.submit(self.store.save_chat, chat_id, title)
+
+    def delete_chat(self, chat_id):
+        self.submit(self.store.delete_chat, chat_id)
+
+    def save_state(self, state):
+        self.submit(self.store.save_state, state, key="state")
+
+    def submit(self, func, *args, key=None):
+        """İşlemi kuyruğa ekler; key verilirse aynı anahtarlı bekleyen işlemin yerine geçer"""
+        with self.cond:
+            if key is None:
+                self.ops.append((func, args, 0))
+            else:
+                self.keyed[key] = (func, args, 0)
+            now = time.monotonic()
+            if self.first_dirty is None:
+                self.first_dirty = now
+            self.last_dirty = now
+            self.cond.notify()
+
+    def has_pending(self):
+        with self.cond:
+            return bool(self.ops or self.keyed)
+
+    def _take(self):
+        batch = self.ops + list(self.keyed.values())
+        self.ops = []
+        self.keyed = {}
+        self.first_dirty = None
+        self.last_dirty = None
+        self.retry_at = None
+        return batch
+
+    def _write(self, batch):
+        if not batch:
+            return
+        started = time.perf_counter()
+        try:
+            with self.store.transaction():
+                for func, args, _ in batch:
+                    func(*args)
+        except Exception as e:
+            # Grup geri alındı; tek hatalı işlem diğerlerini kaybettirmesin
+            logger.warning(f"Kayıt grubu yazılamadı, işlemler tek tek deneniyor: {str(e)}")
+            self._write_each(batch)
+            return
+        self.batches += 1
+        logger.debug(f"{len(batch)} işlem tek seferde yazıldı ({(time.perf_counter() - started) * 1000:.1f} ms)")
+
+    def _write_each(self, batch):
+        retry = []
+        for func, args, attempts in batch:
+            try:
+                with self.store.transaction():
+                    func(*args)
+            except Exception as e:
+                attempts += 1
+                name = getattr(func, "__name__", "işlem")
+                if attempts >= MAX_ATTEMPTS:
+                    logger.error(f"Kayıt {attempts} denemede yazılamadı, vazgeçildi ({name}): {str(e)}")
+                    self.failed.append((func, args, str(e)))
+                else:
+                    logger.error(f"Kayıt yazılamadı, yeniden denenecek ({name}): {str(e)}")
+                    retry.append((func, args, attempts))
+        if not retry:
+            return
+        with self.cond:
+            # Yeniden denenecekler sonradan gelenlerden önce yazılır
+            self.ops[:0] = retry
+            now = time.monotonic()
+            self.retry_at = now + RETRY_DELAY * max(attempts for _, _, attempts in retry)
+            if self.first_dirty is None:
+                self.first_dirty = now
+            self.last_dirty = now
+            self.cond.notify()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.running and self.first_dirty is None:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                # Sessizlik penceresi dolana veya üst sınıra ulaşılana dek bekle
+                while self.running and self.first_dirty is not None:
+                    deadline = min(self.last_dirty + self.window, self.first_dirty + self.max_delay)
+                    if self.retry_at is not None:
+                        deadline = max(deadline, self.retry_at)
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.cond.wait(remaining)
+            # Sıra korunsun diye kuyruk yazma kilidi altında alınır
+            with self.write_lock:
+                with self.cond:
+                    batch = self._take()
+                self._write(batch)
+
+    def flush(self):
+        """Bekleyen tüm işlemleri çağıran iş parçacığında hemen yazar; hepsi yazıldıysa True"""
+        with self.write_lock:
+            with self.cond:
+                batch = self._take()
+            self._write(batch)
+            self.store.flush()
+        return not self.failed and not self.has_pending()
+
+    def close(self):
+        """Bekleyenleri yazar ve iş parçacığını durdurur; kaydedilemeyen işlem kaldıysa False"""
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        self.thread.join()
+        # Kapanışta beklemeden, her işlem en fazla MAX_ATTEMPTS kez denenir
+        for _ in range(MAX_ATTEMPTS):
+            if self.flush():
+                return True
+        if self.failed:
+            logger.error(f"Kapanışta {len(self.failed)} kayıt işlemi diske yazılamadı")
+        return False
@@ -0,0 +1,116 @@
+import os
+import json
+import logging
+
+try:
+    import orjson
+except ImportError:  # Hızlı JSON kodlayıcı isteğe bağlıdır
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # İkili biçim isteğe bağlıdır
+    msgpack = None
+
+logger = logging.getLogger('DeepSeekChat.storage.serializers')
+
+# JSON belgeleri bu baytlardan biriyle başlar; diğer her şey msgpack kabul edilir
+_JSON_LEADING = b"{[\"-0123456789tfn \t\r\n"
+
+
+class JsonSerializer:
+    """Standart kütüphane json'u ile girintisiz, ayraç boşluksuz JSON"""
+
+    name = "json"
+    extension = ".json"
+
+    def dumps(self, obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonSerializer(JsonSerializer):
+    """orjson ile aynı JSON çıktısı, birkaç kat daha hızlı"""
+
+    name = "orjson"
+
+    def dumps(self, obj):
+        return orjson.dumps(obj)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+class MsgpackSerializer:
+    """msgpack ikili biçimi; en küçük dosya boyutu"""
+
+    name = "msgpack"
+    extension = ".msgpack"
+
+    def dumps(self, obj):
+        return msgpack.packb(obj, use_bin_type=True)
+
+    def loads(self, data):
+        return msgpack.unpackb(data, raw=False)
+
+
+def available_serializers():
+    """Bu ortamda kullanılabilen biçim adları"""
+    names = ["json"]
+    if orjson is not None:
+        names.append("orjson")
+    if msgpack is not None:
+        names.append("msgpack")
+    return names
+
+
+def get_serializer(name="auto"):
+    """Adı verilen biçimi döndürür; "auto" kurulu en hızlı JSON kodlayıcıyı seçer"""
+    if name in (None, "auto"):
+        name = "orjson" if orjson is not None else "json"
+    if name == "json":
+        return JsonSerializer()
+    if name == "orjson":
+        if orjson is None:
+            logger.warning("orjson kurulu değil, standart json kullanılıyor")
+            return JsonSerializer()
+        return OrjsonSerializer()
+    if name == "msgpack":
+        if msgpack is None:
+            raise ValueError("msgpack biçimi için 'msgpack' paketi kurulu olmalı")
+        return MsgpackSerializer()
+    raise ValueError(f"Bilinmeyen kayıt biçimi: {name}")
+
+
+def detect_serializer(data):
+    """Dosya içeriğinin biçimini ilk baytından tahmin eder"""
+    if not data or data[0] in _JSON_LEADING:
+        return get_serializer("auto")
+    if msgpack is None:
+        raise ValueError("Dosya msgpack biçiminde ancak 'msgpack' paketi kurulu değil")
+    return MsgpackSerializer()
+
+
+def loads(data):
+    """Biçimi otomatik algılayarak çözer"""
+    if data[:3] == b"\xef\xbb\xbf":
+        data = data[3:]
+    return detect_serializer(data).loads(data)
+
+
+def load_file(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+
+def dump_file(obj, path, serializer=None):
+    """Nesneyi geçici dosya üzerinden atomik olarak yazar"""
+    serializer = serializer or get_serializer()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(serializer.dumps(obj))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
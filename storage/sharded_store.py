@@ -0,0 +1,174 @@
+import os
+import re
+import logging
+import threading
+from contextlib import contextmanager
+from .base import ChatStore
+from .serializers import get_serializer, load_file, dump_file
+from .models import to_epoch, last_activity
+
+logger = logging.getLogger('DeepSeekChat.storage.sharded')
+
+SHARD_DIR = "chats"
+INDEX_FILE = "index.json"
+
+_SAFE_ID = re.compile(r"[^A-Za-z0-9_-]")
+
+
+class ShardedStore(ChatStore):
+    """Her sohbeti ayrı bir parça dosyasında, başlık ve düzeni küçük bir dizinde saklar.
+
+    index.json sohbet listesi, proje ağacı, ayarlar ve sohbet başlıklarını
+    tutar; mesajlar chats/<sohbet_id>.jsonl dosyasına satır satır eklenir.
+    Açılışta yalnızca dizin okunur. Dizin seçilen biçimde (JSON/msgpack)
+    yazılır; parçalar ekleme yapılabilsin diye her zaman JSON satırlarıdır.
+    """
+
+    lazy_loading = True
+
+    def __init__(self, root=SHARD_DIR, serializer="auto"):
+        self.root = root
+        self.serializer = get_serializer(serializer)
+        self.line_codec = get_serializer("auto")
+        self.index_path = os.path.join(root, INDEX_FILE)
+        self.lock = threading.RLock()
+        self.batch_depth = 0
+        os.makedirs(root, exist_ok=True)
+        self.read_index()
+
+    def read_index(self):
+        """Dizini diskten okur; bellekteki kaydedilmemiş değişiklikler atılır"""
+        self.state = {}
+        self.titles = {}
+        self.index_dirty = False
+        if os.path.exists(self.index_path):
+            index = load_file(self.index_path)
+            self.state = index.get("state", {})
+            self.titles = index.get("titles", {})
+
+    def is_empty(self):
+        return not os.path.exists(self.index_path)
+
+    def shard_path(self, chat_id):
+        return os.path.join(self.root, _SAFE_ID.sub("_", str(chat_id)) + ".jsonl")
+
+    def load_state(self, messages=True):
+        with self.lock:
+            state = dict(self.state)
+            state["chat_data"] = {
+                chat_id: {"title": title, "messages": self.load_chat(chat_id)} if messages else {"title": title}
+                for chat_id, title in self.titles.items()
+            }
+            return state
+
+    def load_chat(self, chat_id):
+        path = self.shard_path(chat_id)
+        messages = []
+        if not os.path.exists(path):
+            return messages
+        with open(path, "rb") as f:
+            for line in f:
+                try:
+                    messages.append(self.line_codec.loads(line))
+                except ValueError:
+                    logger.warning(f"Bozuk mesaj satırı atlandı: {path}")
+        return messages
+
+    def load_page(self, chat_id, before=None, limit=None):
+        path = self.shard_path(chat_id)
+        if not os.path.exists(path):
+            return 0, []
+        with open(path, "rb") as f:
+            lines = f.readlines()
+        end = len(lines) if before is None else min(before, len(lines))
+        start = 0 if limit is None else max(0, end - limit)
+        # Yalnızca istenen sayfadaki satırlar çözülür
+        messages = []
+        for line in lines[start:end]:
+            try:
+                messages.append(self.line_codec.loads(line))
+            except ValueError:
+                logger.warning(f"Bozuk mesaj satırı atlandı: {path}")
+        return start, messages
+
+    def add_message(self, chat_id, message):
+        with self.lock:
+            if chat_id not in self.titles:
+                self.titles[chat_id] = ""
+                self.mark_index_dirty()
+            with open(self.shard_path(chat_id), "ab") as f:
+                f.write(self.line_codec.dumps(message) + b"\n")
+
+    def save_chat(self, chat_id, title):
+        with self.lock:
+            if self.titles.get(chat_id) != title:
+                self.titles[chat_id] = title
+                self.mark_index_dirty()
+
+    def delete_chat(self, chat_id):
+        with self.lock:
+            self.titles.pop(chat_id, None)
+            path = self.shard_path(chat_id)
+            if os.path.exists(path):
+                os.remove(path)
+            self.mark_index_dirty()
+
+    def save_state(self, state):
+        with self.lock:
+            if state == self.state:
+                return
+            self.state = state
+            self.mark_index_dirty()
+
+    def idle_chats(self, before):
+        with self.lock:
+            chat_ids = list(self.titles)
+        idle = []
+        for chat_id in chat_ids:
+            path = self.shard_path(chat_id)
+            if os.path.exists(path) and os.path.getmtime(path) < before:
+                idle.append(chat_id)
+        return idle
+
+    def import_chat(self, chat_id, title, messages, updated_at=None):
+        with self.lock:
+            path = self.shard_path(chat_id)
+            with open(path, "wb") as f:
+                f.writelines(self.line_codec.dumps(m) + b"\n" for m in messages)
+            # idle_chats parça dosyasının değişme zamanına bakar
+            activity = to_epoch(updated_at or last_activity(messages))
+            if activity is not None:
+                os.utime(path, (activity, activity))
+            self.titles[chat_id] = title
+            self.mark_index_dirty()
+
+    def mark_index_dirty(self):
+        self.index_dirty = True
+        if self.batch_depth == 0:
+            self.write_index()
+
+    @contextmanager
+    def transaction(self):
+        """Grup boyunca dizin yalnızca bir kez, grup başarıyla biterse yazılır"""
+        with self.lock:
+            self.batch_depth += 1
+            try:
+                yield
+            except Exception:
+                # Dizin diskteki son tutarlı haline geri döner
+                self.read_index()
+                raise
+            finally:
+                self.batch_depth -= 1
+            if self.batch_depth == 0:
+                self.write_index()
+
+    def write_index(self):
+        with self.lock:
+            if not self.index_dirty:
+                return
+            dump_file({"state": self.state, "titles": self.titles}, self.index_path, self.serializer)
+            self.index_dirty = False
+
+    def flush(self):
+        self.write_index()
@@ -0,0 +1,258 @@
+import json
+import logging
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from .base import ChatStore
+from .models import to_iso, last_activity
+
+logger = logging.getLogger('DeepSeekChat.storage.sqlite')
+
+DATABASE_FILE = "chats.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chats (
+    id TEXT PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    updated_at TEXT
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id TEXT NOT NULL REFERENCES chats(id) ON DELETE CASCADE,
+    sender TEXT NOT NULL,
+    message TEXT NOT NULL,
+    timestamp TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_messages_chat ON messages(chat_id, id);
+CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages(timestamp);
+CREATE TABLE IF NOT EXISTS chat_list (
+    position INTEGER PRIMARY KEY,
+    chat_id TEXT NOT NULL,
+    title TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS projects (
+    position INTEGER PRIMARY KEY,
+    id TEXT,
+    name TEXT NOT NULL,
+    instructions TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS project_chats (
+    project_position INTEGER NOT NULL REFERENCES projects(position) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    chat_id TEXT,
+    title TEXT NOT NULL,
+    PRIMARY KEY (project_position, position)
+);
+CREATE INDEX IF NOT EXISTS idx_project_chats_chat ON project_chats(chat_id);
+CREATE TABLE IF NOT EXISTS project_files (
+    project_position INTEGER NOT NULL REFERENCES projects(position) ON DELETE CASCADE,
+    path TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+class SQLiteStore(ChatStore):
+    """Sohbetleri, mesajları, projeleri ve ayarları WAL modunda SQLite'ta saklar"""
+
+    lazy_loading = True
+
+    def __init__(self, path=DATABASE_FILE):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self.last_state = None
+
+    def is_empty(self):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT NOT EXISTS (SELECT 1 FROM chats) AND NOT EXISTS (SELECT 1 FROM settings)"
+            ).fetchone()[0] == 1
+
+    def load_state(self, messages=True):
+        with self.lock:
+            state = {}
+            for key, value in self.conn.execute("SELECT key, value FROM settings"):
+                state[key] = json.loads(value)
+
+            state["chats"] = [
+                {"title": title, "id": chat_id}
+                for chat_id, title in self.conn.execute(
+                    "SELECT chat_id, title FROM chat_list ORDER BY position"
+                )
+            ]
+
+            projects = []
+            project_context = {}
+            for position, project_id, name, instructions in self.conn.execute(
+                "SELECT position, id, name, instructions FROM projects ORDER BY position"
+            ):
+                children = [
+                    {"text": title, "id": chat_id, "children": []}
+                    for chat_id, title in self.conn.execute(
+                        "SELECT chat_id, title FROM project_chats WHERE project_position = ? ORDER BY position",
+                        (position,)
+                    )
+                ]
+                projects.append({"text": name, "id": project_id, "children": children})
+                files = [
+                    row[0] for row in self.conn.execute(
+                        "SELECT path FROM project_files WHERE project_position = ? ORDER BY rowid", (position,)
+                    )
+                ]
+                if instructions or files:
+                    project_context[str(position)] = {"instructions": instructions, "files": files}
+            state["projects"] = projects
+            state["project_context"] = project_context
+
+            chat_data = {}
+            for chat_id, title in self.conn.execute("SELECT id, title FROM chats"):
+                chat_data[chat_id] = {"title": title, "messages": []} if messages else {"title": title}
+            if messages:
+                for chat_id, sender, message, timestamp in self.conn.execute(
+                    "SELECT chat_id, sender, message, timestamp FROM messages ORDER BY chat_id, id"
+                ):
+                    chat_data[chat_id]["messages"].append(
+                        {"sender": sender, "message": message, "timestamp": timestamp}
+                    )
+            state["chat_data"] = chat_data
+            return state
+
+    def load_chat(self, chat_id):
+        with self.lock:
+            return [
+                {"sender": sender, "message": message, "timestamp": timestamp}
+                for sender, message, timestamp in self.conn.execute(
+                    "SELECT sender, message, timestamp FROM messages WHERE chat_id = ? ORDER BY id", (chat_id,)
+                )
+            ]
+
+    def load_page(self, chat_id, before=None, limit=None):
+        with self.lock:
+            (count,) = self.conn.execute("SELECT COUNT(*) FROM messages WHERE chat_id = ?", (chat_id,)).fetchone()
+            end = count if before is None else min(before, count)
+            start = 0 if limit is None else max(0, end - limit)
+            rows = self.conn.execute(
+                "SELECT sender, message, timestamp FROM messages WHERE chat_id = ? ORDER BY id LIMIT ? OFFSET ?",
+                (chat_id, end - start, start),
+            )
+            return start, [
+                {"sender": sender, "message": message, "timestamp": timestamp}
+                for sender, message, timestamp in rows
+            ]
+
+    def add_message(self, chat_id, message):
+        with self.lock:
+            self.conn.execute("INSERT OR IGNORE INTO chats (id) VALUES (?)", (chat_id,))
+            self.conn.execute(
+                "INSERT INTO messages (chat_id, sender, message, timestamp) VALUES (?, ?, ?, ?)",
+                (chat_id, message["sender"], message["message"], message.get("timestamp"))
+            )
+            self.conn.execute(
+                "UPDATE chats SET updated_at = ? WHERE id = ?", (message.get("timestamp"), chat_id)
+            )
+
+    def save_chat(self, chat_id, title):
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO chats (id, title) VALUES (?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET title = excluded.title",
+                (chat_id, title)
+            )
+
+    def delete_chat(self, chat_id):
+        with self.lock:
+            self.conn.execute("DELETE FROM chats WHERE id = ?", (chat_id,))
+
+    def save_state(self, state):
+        """Düzen ve ayar tablolarını tek işlemde yeniden yazar; değişmediyse yazmaz"""
+        if state == self.last_state:
+            return
+        self.last_state = state
+        state = dict(state)
+        chats = state.pop("chats", [])
+        projects = state.pop("projects", [])
+        project_context = state.pop("project_context", {})
+
+        with self.lock:
+            self.conn.execute("SAVEPOINT state")
+            try:
+                self.conn.execute("DELETE FROM chat_list")
+                self.conn.executemany(
+                    "INSERT INTO chat_list (position, chat_id, title) VALUES (?, ?, ?)",
+                    [(i, chat["id"], chat["title"]) for i, chat in enumerate(chats)]
+                )
+                self.conn.execute("DELETE FROM projects")
+                for position, project in enumerate(projects):
+                    ctx = project_context.get(str(position), {})
+                    self.conn.execute(
+                        "INSERT INTO projects (position, id, name, instructions) VALUES (?, ?, ?, ?)",
+                        (position, project.get("id"), project["text"], ctx.get("instructions", ""))
+                    )
+                    self.conn.executemany(
+                        "INSERT INTO project_chats (project_position, position, chat_id, title) VALUES (?, ?, ?, ?)",
+                        [(position, i, child.get("id"), child["text"]) for i, child in enumerate(project.get("children", []))]
+                    )
+                    self.conn.executemany(
+                        "INSERT INTO project_files (project_position, path) VALUES (?, ?)",
+                        [(position, path) for path in ctx.get("files", [])]
+                    )
+                self.conn.execute("DELETE FROM settings")
+                self.conn.executemany(
+                    "INSERT INTO settings (key, value) VALUES (?, ?)",
+                    [(key, json.dumps(value, ensure_ascii=False)) for key, value in state.items()]
+                )
+                self.conn.execute("RELEASE state")
+            except Exception:
+                self.conn.execute("ROLLBACK TO state")
+                self.conn.execute("RELEASE state")
+                raise
+
+    def idle_chats(self, before):
+        with self.lock:
+            return [
+                row[0] for row in self.conn.execute(
+                    "SELECT id FROM chats WHERE updated_at IS NOT NULL AND updated_at < ?", (to_iso(before),)
+                )
+            ]
+
+    def import_chat(self, chat_id, title, messages, updated_at=None):
+        if updated_at is None:
+            updated_at = last_activity(messages) or to_iso(time.time())
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO chats (id, title, updated_at) VALUES (?, ?, ?)", (chat_id, title, updated_at)
+            )
+            self.conn.executemany(
+                "INSERT INTO messages (chat_id, sender, message, timestamp) VALUES (?, ?, ?, ?)",
+                [(chat_id, m["sender"], m["message"], m.get("timestamp")) for m in messages]
+            )
+
+    @contextmanager
+    def transaction(self):
+        with self.lock:
+            self.conn.execute("BEGIN")
+            try:
+                yield
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def compact(self):
+        """WAL dosyasını ana veritabanına işler"""
+        with self.lock:
+            self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        with self.lock:
+            self.conn.execute("PRAGMA optimize")
+            self.conn.close()
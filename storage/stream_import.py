@@ -0,0 +1,128 @@
+import os
+import json
+import codecs
+import logging
+
+logger = logging.getLogger('DeepSeekChat.storage.stream_import')
+
+# Dosyadan her seferde okunan bayt; tek bir değer sığmazsa okuma ikiye katlanır
+CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = " \t\r\n"
+# Nesne içindeki bir değerden sonra gelebilecek karakterler
+_DELIMITERS = ",:]}"
+
+
+class StreamingJsonReader:
+    """Büyük bir JSON dosyasını tamamını belleğe almadan, anahtar anahtar okur.
+
+    keys() geçerli nesnenin anahtarlarını sırayla üretir; çağıran her anahtardan
+    sonra ya value() ile değeri okur ya da iç içe nesneler için yeniden keys()
+    çağırır. Bellekte en fazla o an okunan değer kadar veri tutulur.
+    """
+
+    def __init__(self, f, chunk_size=CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    def _fill(self, size=None):
+        """Arabelleğe yeni veri ekler; dosya bittiyse False döndürür"""
+        if self.eof:
+            return False
+        data = self.f.read(size or self.chunk_size)
+        self.bytes_read += len(data)
+        if not data:
+            self.eof = True
+        self.buf = self.buf[self.pos:] + self.text_decoder.decode(data, final=not data)
+        self.pos = 0
+        return bool(data)
+
+    def _peek(self):
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def _expect(self, char):
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"JSON okunamadı: '{char}' bekleniyordu, '{found}' bulundu ({self.bytes_read}. bayt civarı)")
+        self.pos += 1
+
+    def value(self):
+        """Sıradaki JSON değerini tamamen okur"""
+        self._peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # Parça sınırında kesilen sayı ("0." veya "1.5e") eksik haliyle de çözülür;
+                # değer ancak ardından bir ayraç geldiyse tamamdır
+                after = end
+                while after < len(self.buf) and self.buf[after] in _WHITESPACE:
+                    after += 1
+                if self.eof or (after < len(self.buf) and self.buf[after] in _DELIMITERS):
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill(size)
+            size *= 2
+
+    def keys(self):
+        """Geçerli nesnenin anahtarlarını sırayla üretir"""
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(":")
+            yield key
+            if self._peek() == ",":
+                self.pos += 1
+                continue
+            self._expect("}")
+            return
+
+
+def iter_state(path, progress=None):
+    """app_state dosyasını akış halinde okur.
+
+    ("chat", sohbet_id, sohbet) ve ("setting", anahtar, değer) demetleri
+    üretir; chat_data içindeki sohbetler tek tek gelir.
+    """
+    total = os.path.getsize(path)
+    with open(path, "rb") as f:
+        reader = StreamingJsonReader(f)
+        for key in reader.keys():
+            if key == "chat_data":
+                for chat_id in reader.keys():
+                    yield "chat", chat_id, reader.value()
+                    if progress:
+                        progress(reader.bytes_read, total)
+            else:
+                yield "setting", key, reader.value()
+    if progress:
+        progress(total, total)
+
+
+def upgrade_state(state, chat_titles):
+    """Eski sürümlerin ayarlarını "version" alanına göre güncel biçime getirir"""
+    version = state.get("version")
+    if version is None:
+        # 1.0 öncesi kayıtlar: tema adı farklı, sohbet listesi yok
+        if "current_theme" in state:
+            state.setdefault("theme", state.pop("current_theme"))
+        logger.info("Sürümsüz (1.0 öncesi) durum dosyası güncel biçime çevrildi")
+    if "chats" not in state:
+        state["chats"] = [{"title": title, "id": chat_id} for chat_id, title in chat_titles.items()]
+    return state
@@ -0,0 +1,21 @@
+from context_window import MODEL_CONTEXT_WINDOWS, context_budget, fit_to_context, max_reply_tokens
+
+SMALL_MODEL = "deepseek/deepseek-math:7b"
+
+
+def test_small_window_reply_fits_in_window():
+    window = MODEL_CONTEXT_WINDOWS[SMALL_MODEL]
+    max_tokens = max_reply_tokens(SMALL_MODEL)
+    assert 0 < max_tokens < window
+    assert context_budget(SMALL_MODEL, max_tokens) > 0
+
+
+def test_small_window_keeps_more_than_newest_message():
+    messages = [{"role": "user", "content": f"soru {i}"} for i in range(10)]
+    kept, dropped, used = fit_to_context(messages, SMALL_MODEL, max_reply_tokens(SMALL_MODEL))
+    assert kept == messages
+    assert dropped == 0
+
+
+def test_large_window_reply_is_capped():
+    assert max_reply_tokens("deepseek/deepseek-r1:free") == 4096
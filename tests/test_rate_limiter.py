@@ -0,0 +1,37 @@
+import pytest
+
+from rate_limiter import RateLimiter, TokenBucket
+
+
+def make_bucket():
+    bucket = TokenBucket(60)  # saniyede bir istek
+    return bucket, bucket.updated
+
+
+def test_waiters_leave_at_configured_rate_after_block():
+    bucket, now = make_bucket()
+    bucket.block_for(10, now)
+    waits = [bucket.reserve(now)[0] for _ in range(3)]
+    assert waits == pytest.approx([10.0, 11.0, 12.0])
+
+
+def test_no_refill_while_blocked():
+    bucket, now = make_bucket()
+    bucket.block_for(10, now)
+    bucket.reserve(now)
+    # Engel sürerken gelen istek de engel bitiminden sonraki sıraya girer
+    wait, position = bucket.reserve(now + 5)
+    assert wait == pytest.approx(6.0)
+    assert position == 1
+
+
+def test_refill_resumes_after_block():
+    bucket, now = make_bucket()
+    bucket.block_for(10, now)
+    wait, _ = bucket.reserve(now + 20)
+    assert wait == 0.0
+
+
+def test_fresh_limiter_does_not_wait():
+    limiter = RateLimiter()
+    assert limiter.acquire("anahtar", "yeni/model") == (0.0, 0)
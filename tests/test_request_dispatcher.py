@@ -0,0 +1,24 @@
+from request_dispatcher import RequestDispatcher
+
+
+def make_dispatcher():
+    dispatcher = RequestDispatcher()
+    events = []
+    dispatcher.duplicate_dropped.connect(lambda chat_id, total: events.append(("duplicate", chat_id)))
+    dispatcher.request_blocked.connect(lambda chat_id: events.append(("blocked", chat_id)))
+    return dispatcher, events
+
+
+def test_same_message_while_pending_is_coalesced():
+    dispatcher, events = make_dispatcher()
+    assert dispatcher.try_acquire("c1", "merhaba")
+    assert not dispatcher.try_acquire("c1", "merhaba")
+    assert events == [("duplicate", "c1")]
+
+
+def test_different_message_while_pending_is_blocked_not_coalesced():
+    dispatcher, events = make_dispatcher()
+    assert dispatcher.try_acquire("c1", "merhaba")
+    assert not dispatcher.try_acquire("c1", "başka bir soru")
+    assert events == [("blocked", "c1")]
+    assert dispatcher.dropped_count == 0
@@ -0,0 +1,37 @@
+from storage import BackgroundSaver, SQLiteStore
+
+
+class FlakyStore(SQLiteStore):
+    """Belirli bir sohbete yazarken hata veren depo"""
+
+    def add_message(self, chat_id, message):
+        if chat_id == "bozuk":
+            raise ValueError("yazılamadı")
+        super().add_message(chat_id, message)
+
+
+def message(text):
+    return {"sender": "user", "message": text, "timestamp": "2026-01-01T10:00:00"}
+
+
+def test_one_bad_operation_does_not_drop_batch(tmp_path):
+    store = FlakyStore(str(tmp_path / "chats.db"))
+    saver = BackgroundSaver(store, window=60, max_delay=60)
+    saver.save_chat("iyi", "İyi sohbet")
+    saver.add_message("iyi", message("bir"))
+    saver.add_message("bozuk", message("kaybolur"))
+    saver.add_message("iyi", message("iki"))
+
+    assert saver.close() is False
+    assert [m["message"] for m in store.load_chat("iyi")] == ["bir", "iki"]
+    assert len(saver.failed) == 1
+    store.close()
+
+
+def test_close_reports_success(tmp_path):
+    store = SQLiteStore(str(tmp_path / "chats.db"))
+    saver = BackgroundSaver(store)
+    saver.add_message("iyi", message("bir"))
+    assert saver.close() is True
+    assert len(store.load_chat("iyi")) == 1
+    store.close()
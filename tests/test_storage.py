@@ -0,0 +1,64 @@
+import os
+import time
+
+from storage import SQLiteStore, ShardedStore, StateJournal, Message, Sender
+from storage.models import to_epoch
+
+OLD_MESSAGES = [
+    {"sender": "user", "message": "Merhaba", "timestamp": "2025-07-05T10:00:00"},
+    {"sender": "assistant", "message": "Selam", "timestamp": "2025-07-05T10:00:05"},
+]
+
+
+def test_sqlite_imported_old_chat_is_idle(tmp_path):
+    store = SQLiteStore(str(tmp_path / "chats.db"))
+    try:
+        store.import_chat("eski", "Eski sohbet", OLD_MESSAGES)
+        assert store.idle_chats(time.time()) == ["eski"]
+        assert store.idle_chats(to_epoch("2025-07-01T00:00:00")) == []
+    finally:
+        store.close()
+
+
+def test_sqlite_import_with_explicit_activity_is_not_idle(tmp_path):
+    store = SQLiteStore(str(tmp_path / "chats.db"))
+    try:
+        store.import_chat("geri", "Arşivden çıkan", OLD_MESSAGES, "2026-10-01T00:00:00")
+        assert store.idle_chats(to_epoch("2026-09-01T00:00:00")) == []
+    finally:
+        store.close()
+
+
+def test_sharded_imported_old_chat_is_idle(tmp_path):
+    store = ShardedStore(str(tmp_path / "chats"))
+    try:
+        store.import_chat("eski", "Eski sohbet", OLD_MESSAGES)
+        assert store.idle_chats(time.time()) == ["eski"]
+    finally:
+        store.close()
+
+
+def test_journal_compact_resumes_without_live_journal(tmp_path):
+    journal_path = str(tmp_path / "app_state.journal")
+    journal = StateJournal(str(tmp_path / "app_state.json"), journal_path)
+    journal.load_state()
+    journal.save_chat("c1", "Yarım kalan")
+    journal.file.close()
+    journal.file = None
+    # Sıkıştırma sırasında çökmüş gibi: yalnızca döndürülmüş günlük kalır
+    os.replace(journal_path, journal.rotated_path)
+
+    journal = StateJournal(str(tmp_path / "app_state.json"), journal_path)
+    journal.load_state()
+    journal.compact()
+    journal.wait_for_compaction()
+
+    assert not os.path.exists(journal.rotated_path)
+    assert journal.load_state()["chat_data"]["c1"]["title"] == "Yarım kalan"
+
+
+def test_unknown_sender_survives_round_trip():
+    data = {"sender": "system", "message": "Kısa yanıt ver", "timestamp": "2026-10-01T00:00:00"}
+    message = Message.from_dict(data)
+    assert message.sender is Sender.ASSISTANT
+    assert message.to_dict() == data
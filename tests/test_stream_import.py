@@ -0,0 +1,25 @@
+import io
+
+import pytest
+
+from storage.stream_import import StreamingJsonReader
+
+DOCUMENT = '{"a": 0.75, "b": 1, "c": -1.5e-3, "d": [true, null, 2.0], "e": {"f": "ğüş"}, "g": 10}'
+
+
+def read_all(reader):
+    result = {}
+    for key in reader.keys():
+        if key == "e":
+            result[key] = {inner: reader.value() for inner in reader.keys()}
+        else:
+            result[key] = reader.value()
+    return result
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 4, 5, 8, 16, 1024])
+def test_numbers_split_across_chunks(chunk_size):
+    reader = StreamingJsonReader(io.BytesIO(DOCUMENT.encode("utf-8")), chunk_size=chunk_size)
+    assert read_all(reader) == {
+        "a": 0.75, "b": 1, "c": -1.5e-3, "d": [True, None, 2.0], "e": {"f": "ğüş"}, "g": 10,
+    }
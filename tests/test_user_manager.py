@@ -0,0 +1,29 @@
+import os
+import hashlib
+
+from storage.serializers import dump_file, get_serializer
+from user_manager import UserManager
+
+
+def test_user_file_uses_serializer_extension(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = UserManager("json", users_dir=str(tmp_path / "users"))
+    ok, _ = manager.register_user("a@example.com", "parola")
+    assert ok
+    assert os.path.basename(manager.user_path("a@example.com")).endswith(".json")
+    assert os.path.exists(manager.user_path("a@example.com"))
+
+
+def test_user_file_with_other_extension_is_converted(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    users_dir = tmp_path / "users"
+    users_dir.mkdir()
+    stem = hashlib.sha256(b"b@example.com").hexdigest()
+    # Başka biçimle kaydedilmiş kullanıcı dosyası
+    dump_file({"email": "b@example.com", "user": {"projects": {}}}, str(users_dir / f"{stem}.msgpack"),
+              get_serializer("json"))
+
+    manager = UserManager("json", users_dir=str(users_dir))
+
+    assert sorted(name for name in os.listdir(users_dir) if not name.endswith(".lock")) == [f"{stem}.json"]
+    assert manager.load_user("b@example.com") == {"projects": {}}
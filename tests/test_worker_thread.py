@@ -0,0 +1,80 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PyQt6.QtCore import Qt
+
+from resilience import RetryPolicy
+from worker_thread import WorkerThread
+
+STALL_SECONDS = 3
+
+
+class StalledHandler(BaseHTTPRequestHandler):
+    """İlk parçadan sonra (ya da başlıklardan önce) susan SSE sunucusu"""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        if self.path.startswith("/before-headers"):
+            time.sleep(STALL_SECONDS)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        event = {"choices": [{"delta": {"content": "Merhaba"}}]}
+        data = f"data: {json.dumps(event)}\n\n".encode()
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+        time.sleep(STALL_SECONDS)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), StalledHandler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+
+
+def start_worker(endpoint, model):
+    worker = WorkerThread("test", [{"role": "user", "content": "selam"}], model, stream=True,
+                          retry_policy=RetryPolicy(max_retries=0))
+    worker.endpoint = endpoint
+    chunks = threading.Event()
+    cancelled = []
+    # Olay döngüsü yok; sinyaller yayıldıkları iş parçacığında işlenir
+    worker.chunk_received.connect(lambda chunk: chunks.set(), Qt.ConnectionType.DirectConnection)
+    worker.cancelled.connect(cancelled.append, Qt.ConnectionType.DirectConnection)
+    thread = threading.Thread(target=worker.run, daemon=True)
+    thread.start()
+    return worker, thread, chunks, cancelled
+
+
+def cancel_and_time(worker, thread):
+    started = time.monotonic()
+    worker.cancel()
+    thread.join(timeout=STALL_SECONDS)
+    return time.monotonic() - started
+
+
+def test_cancel_during_stalled_stream_returns_quickly(server):
+    worker, thread, chunks, cancelled = start_worker(server + "/stream", "test/stalled-stream")
+    assert chunks.wait(2)
+    assert cancel_and_time(worker, thread) < 1.0
+    assert cancelled == ["Merhaba"]
+
+
+def test_cancel_before_headers_returns_quickly(server):
+    worker, thread, chunks, cancelled = start_worker(server + "/before-headers", "test/stalled-headers")
+    time.sleep(0.3)
+    assert cancel_and_time(worker, thread) < 1.0
+    assert cancelled == [""]
+    assert not chunks.is_set()
@@ -0,0 +1,350 @@
+import math
+import logging
+from collections import OrderedDict
+from PyQt6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView, QApplication, QMenu
+from PyQt6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRectF, QEvent
+from PyQt6.QtGui import QTextDocument, QTextCursor, QFontMetrics, QAbstractTextDocumentLayout, QPalette
+
+logger = logging.getLogger('DeepSeekChat.transcript_view')
+
+# Bu sayıdan uzun sohbetler sanal listede gösterilir
+VIRTUALIZE_THRESHOLD = 300
+
+SENDER_ROLE = Qt.ItemDataRole.UserRole + 1
+MESSAGE_PADDING = 8
+# Dizilmiş belgesi bellekte tutulan en fazla satır sayısı (görünenler ve yakın geçmiş)
+DOCUMENT_CACHE_ROWS = 200
+
+
+def message_html(sender, message):
+    """Sohbet ekranında tek bir mesajın HTML'i"""
+    if sender == "user":
+        prefix = "Siz:"
+        msg_class = "user-message"
+    else:
+        prefix = "DeepSeek:"
+        msg_class = "assistant-message"
+    return (
+        f"<div class='chat-message {msg_class}'>"
+        f"<span class='sender'>{prefix}</span>"
+        f"<div class='message-text'>{message}</div>"
+        "</div>"
+    )
+
+
+class TranscriptRow:
+    """Modeldeki tek mesaj ve gecikmeli hesaplanan boyut bilgisi"""
+
+    __slots__ = ("sender", "text", "size_key", "height", "exact", "measured", "document", "layout", "layout_key")
+
+    def __init__(self, sender, text):
+        self.sender = sender
+        self.text = text
+        self.size_key = None
+        self.height = 0
+        self.exact = False
+        # Bir kez çizilip gerçek yüksekliği ölçüldü mü (genişlik değişse de tahminden iyidir)
+        self.measured = False
+        # Yalnızca akış sürerken dolu: metin bu belgenin sonuna eklenir
+        self.document = None
+        # Son çizimde dizilmiş belge; size_key ile aynı anahtarla geçerlidir
+        self.layout = None
+        self.layout_key = None
+
+
+class TranscriptModel(QAbstractListModel):
+    """Sohbet mesajlarını satır satır sunan liste modeli"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return row.text
+        if role == SENDER_ROLE:
+            return row.sender
+        return None
+
+    def row(self, position):
+        return self.rows[position]
+
+    def set_messages(self, messages):
+        """(gönderen, metin) çiftleriyle modeli baştan kurar"""
+        self.beginResetModel()
+        self.rows = [TranscriptRow(sender, text) for sender, text in messages]
+        self.endResetModel()
+
+    def prepend_messages(self, messages):
+        """Sonradan yüklenen eski mesajları başa ekler"""
+        if not messages:
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(messages) - 1)
+        self.rows[:0] = [TranscriptRow(sender, text) for sender, text in messages]
+        self.endInsertRows()
+
+    def append_message(self, sender, text):
+        position = len(self.rows)
+        self.beginInsertRows(QModelIndex(), position, position)
+        self.rows.append(TranscriptRow(sender, text))
+        self.endInsertRows()
+        return position
+
+    def append_text(self, position, chunk):
+        """Akış satırının belgesinin sonuna metin ekler; önceki metin yeniden dizilmez"""
+        row = self.rows[position]
+        if row.document is None:
+            row.document = QTextDocument()
+            row.document.setDocumentMargin(0)
+            row.document.setHtml(message_html(row.sender, ""))
+        cursor = QTextCursor(row.document)
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(chunk)
+        row.text += chunk
+        index = self.index(position)
+        self.dataChanged.emit(index, index)
+
+    def refresh_rows(self, matches):
+        """Metni matches(text) koşulunu sağlayan satırları yeniden dizdirir"""
+        for position, row in enumerate(self.rows):
+            if row.document is not None or not matches(row.text):
+                continue
+            row.size_key = None
+            row.layout = None
+            row.layout_key = None
+            index = self.index(position)
+            self.dataChanged.emit(index, index)
+
+    def finish_stream(self, position):
+        """Akış bitince satır normal (Markdown) çizime döner"""
+        if position >= len(self.rows):
+            return
+        row = self.rows[position]
+        row.document = None
+        row.size_key = None
+        row.layout = None
+        row.layout_key = None
+        index = self.index(position)
+        self.dataChanged.emit(index, index)
+
+    def clear(self):
+        self.set_messages([])
+
+
+class MessageDelegate(QStyledItemDelegate):
+    """Yalnızca görünen mesajları dizen ve çizen temsilci.
+
+    Boyutlar önce yazı tipi ölçüleriyle ucuzca tahmin edilir, mesaj ilk kez
+    çizildiğinde gerçek yükseklik hesaplanıp satırda saklanır. Genişlik veya
+    yazı tipi değişince tüm önbellek tek bir sayaç artışıyla geçersiz olur.
+    """
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.generation = 0
+        self.laid_out = OrderedDict()
+
+    def invalidate(self):
+        self.generation += 1
+        self.drop_documents()
+
+    def drop_documents(self):
+        """Satırlarda saklanan dizilmiş belgeleri bırakır"""
+        for row in self.laid_out:
+            row.layout = None
+            row.layout_key = None
+        self.laid_out.clear()
+
+    def text_width(self):
+        return max(50, self.view.viewport().width() - 2 * MESSAGE_PADDING)
+
+    def make_document(self, row, font):
+        document = QTextDocument()
+        document.setDefaultFont(font)
+        document.setDocumentMargin(0)
+        document.setTextWidth(self.text_width())
+        document.setHtml(self.view.render_html(row.sender, row.text))
+        return document
+
+    def row_document(self, row, font):
+        """Satırın dizilmiş belgesi; sayaç veya genişlik değişmedikçe yeniden kurulmaz"""
+        key = (self.generation, self.text_width())
+        if row.layout_key != key:
+            row.layout = self.make_document(row, font)
+            row.layout_key = key
+        self.laid_out[row] = None
+        self.laid_out.move_to_end(row)
+        while len(self.laid_out) > DOCUMENT_CACHE_ROWS:
+            old, _ = self.laid_out.popitem(last=False)
+            old.layout = None
+            old.layout_key = None
+        return row.layout
+
+    def stream_document(self, row, font):
+        """Akış belgesini güncel yazı tipi ve genişliğe uydurur; değişmedikçe yeniden dizmez"""
+        document = row.document
+        if document.defaultFont() != font:
+            document.setDefaultFont(font)
+        if document.textWidth() != self.text_width():
+            document.setTextWidth(self.text_width())
+        return document
+
+    def estimate_height(self, row, font):
+        metrics = QFontMetrics(font)
+        per_line = max(1, self.text_width() // max(1, metrics.averageCharWidth()))
+        lines = sum(max(1, math.ceil(len(part) / per_line)) for part in row.text.split("\n"))
+        # Gönderen satırı + metin satırları
+        return (lines + 1) * metrics.lineSpacing()
+
+    def sizeHint(self, option, index):
+        row = index.model().row(index.row())
+        if row.document is not None:
+            row.height = math.ceil(self.stream_document(row, option.font).size().height())
+            return QSize(self.text_width(), row.height + 2 * MESSAGE_PADDING)
+        key = (self.generation, self.text_width())
+        if row.size_key != key:
+            # Ölçülmüş yükseklik tahminden iyidir; tahmine dönmek kaydırma çubuğunu
+            # açıp kapatarak genişliği ve yükseklikleri sonsuza dek değiştirebilir
+            if not row.measured:
+                row.height = self.estimate_height(row, option.font)
+            row.size_key = key
+            row.exact = False
+        return QSize(self.text_width(), row.height + 2 * MESSAGE_PADDING)
+
+    def paint(self, painter, option, index):
+        row = index.model().row(index.row())
+        if row.document is not None:
+            document = self.stream_document(row, option.font)
+        else:
+            document = self.row_document(row, option.font)
+        height = math.ceil(document.size().height())
+        if not row.exact or row.size_key != (self.generation, self.text_width()):
+            changed = height != row.height
+            row.size_key = (self.generation, self.text_width())
+            row.height = height
+            row.exact = True
+            row.measured = True
+            if changed:
+                self.sizeHintChanged.emit(index)
+
+        painter.save()
+        if option.state & QStyle.StateFlag.State_Selected:
+            painter.fillRect(option.rect, option.palette.highlight())
+        elif row.sender != "user":
+            painter.fillRect(option.rect, option.palette.alternateBase())
+        painter.translate(option.rect.left() + MESSAGE_PADDING, option.rect.top() + MESSAGE_PADDING)
+        painter.setClipRect(QRectF(0, 0, self.text_width(), option.rect.height()))
+        context = QAbstractTextDocumentLayout.PaintContext()
+        context.palette.setColor(QPalette.ColorRole.Text, option.palette.color(QPalette.ColorRole.Text))
+        document.documentLayout().draw(painter, context)
+        painter.restore()
+
+
+class TranscriptView(QListView):
+    """Uzun sohbetler için sanallaştırılmış mesaj listesi"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.transcript = TranscriptModel(self)
+        self.delegate = MessageDelegate(self)
+        self.setModel(self.transcript)
+        self.setItemDelegate(self.delegate)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.setUniformItemSizes(False)
+        self.setWordWrap(True)
+        self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.customContextMenuRequested.connect(self.show_context_menu)
+        self.last_width = None
+        # (gönderen, metin) -> mesaj HTML'i; uygulama Markdown önbelleğini bağlar
+        self.render_html = message_html
+
+    def set_messages(self, messages, from_bottom=0):
+        self.delegate.drop_documents()
+        self.transcript.set_messages(messages)
+        if from_bottom:
+            self.keep_from_bottom(from_bottom)
+        else:
+            self.scrollToBottom()
+
+    def prepend_messages(self, messages):
+        """Eski mesajları başa ekler; kullanıcının baktığı yer kaymaz"""
+        scroll_bar = self.verticalScrollBar()
+        from_bottom = scroll_bar.maximum() - scroll_bar.value()
+        self.transcript.prepend_messages(messages)
+        self.keep_from_bottom(from_bottom)
+
+    def keep_from_bottom(self, from_bottom):
+        # Kaydırma çubuğu sınırları ancak satırlar dizildikten sonra doğru
+        self.doItemsLayout()
+        scroll_bar = self.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum() - from_bottom)
+
+    def append_message(self, sender, text):
+        self.transcript.append_message(sender, text)
+        self.scrollToBottom()
+
+    def start_stream(self):
+        """Akış yanıtı için boş asistan satırı açar, satır numarasını döndürür"""
+        position = self.transcript.append_message("assistant", "")
+        self.scrollToBottom()
+        return position
+
+    def append_stream_text(self, position, chunk):
+        at_bottom = self.verticalScrollBar().value() >= self.verticalScrollBar().maximum()
+        self.transcript.append_text(position, chunk)
+        if at_bottom:
+            self.scrollToBottom()
+
+    def finish_stream(self, position):
+        self.transcript.finish_stream(position)
+
+    def clear(self):
+        self.delegate.drop_documents()
+        self.transcript.clear()
+
+    def refresh_rows(self, matches):
+        """HTML'i değişen mesajların satırlarını yeniler; diğer satırlar olduğu gibi kalır"""
+        self.transcript.refresh_rows(matches)
+
+    def refresh(self):
+        """Mesaj HTML'i değiştiğinde boyutları ve görünen satırları yeniler"""
+        self.delegate.invalidate()
+        self.scheduleDelayedItemsLayout()
+        self.viewport().update()
+
+    def resizeEvent(self, event):
+        width = self.viewport().width()
+        if width != self.last_width:
+            # Satır yükseklikleri genişliğe bağlı
+            self.last_width = width
+            self.delegate.invalidate()
+        super().resizeEvent(event)
+
+    def changeEvent(self, event):
+        if event.type() == QEvent.Type.FontChange:
+            self.delegate.invalidate()
+            self.scheduleDelayedItemsLayout()
+        super().changeEvent(event)
+
+    def copy_selection(self):
+        """Seçili mesajların metnini panoya kopyalar"""
+        rows = sorted(index.row() for index in self.selectedIndexes())
+        text = "\n\n".join(self.transcript.row(row).text for row in rows)
+        QApplication.clipboard().setText(text)
+
+    def show_context_menu(self, pos):
+        menu = QMenu(self)
+        copy_action = menu.addAction("Kopyala")
+        copy_action.setEnabled(bool(self.selectedIndexes()))
+        copy_action.triggered.connect(self.copy_selection)
+        menu.exec(self.viewport().mapToGlobal(pos))
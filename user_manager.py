@@ -1,44 +1,140 @@
 import os
-import json
 import hashlib
 import logging
 import uuid
+from storage.serializers import get_serializer, load_file, dump_file
+from utils.file_lock import file_lock
 
 logger = logging.getLogger('DeepSeekChat.user_manager')
 
+USERS_DIR = "users"
+LEGACY_USERS_FILE = "users.json"
+# Kullanıcı dosyalarının alabileceği uzantılar (kayıt biçimine göre)
+USER_FILE_EXTENSIONS = (".json", ".msgpack")
+
 class UserManager:
-    def __init__(self):
-        """Kullanıcı verilerini yönetir"""
-        self.users_file = "users.json"
-        self.users = self.load_users()
+    def __init__(self, serializer="auto", users_dir=USERS_DIR):
+        """Kullanıcı verilerini yönetir; her kullanıcı kendi dosyasında tutulur"""
+        self.users_file = LEGACY_USERS_FILE
+        self.users_dir = users_dir
+        self.serializer = get_serializer(serializer)
+        # Yüklenmiş kullanıcılar, dosya imzaları ve proje sohbet kümeleri
+        self.users = {}
+        self.signatures = {}
+        self.project_chats = {}
+        os.makedirs(users_dir, exist_ok=True)
+        self.migrate_users_file()
+        self.convert_user_files()
         logger.info("Kullanıcı yöneticisi başlatıldı")
-    
+
+    def user_path(self, email):
+        """E-postadan türetilen, dosya adı olarak güvenli kullanıcı dosyası yolu (uzantı biçime göre)"""
+        return os.path.join(self.users_dir, hashlib.sha256(email.encode()).hexdigest() + self.serializer.extension)
+
+    def convert_user_files(self):
+        """Başka biçimin uzantısıyla kalmış kullanıcı dosyalarını geçerli biçime çevirir"""
+        extension = self.serializer.extension
+        with file_lock(os.path.join(self.users_dir, "migrate")):
+            for name in os.listdir(self.users_dir):
+                stem, ext = os.path.splitext(name)
+                if ext not in USER_FILE_EXTENSIONS or ext == extension:
+                    continue
+                path = os.path.join(self.users_dir, name)
+                target = os.path.join(self.users_dir, stem + extension)
+                try:
+                    with file_lock(path):
+                        if not os.path.exists(target):
+                            dump_file(load_file(path), target, self.serializer)
+                        os.remove(path)
+                except Exception as e:
+                    logger.error(f"Kullanıcı dosyası dönüştürülürken hata ({name}): {str(e)}")
+
+    def migrate_users_file(self):
+        """Eski tek parça users.json'u kullanıcı başına dosyalara böler"""
+        if not os.path.exists(self.users_file):
+            return
+        with file_lock(os.path.join(self.users_dir, "migrate")):
+            # Başka bir örnek bu arada aktarmış olabilir
+            if not os.path.exists(self.users_file):
+                return
+            try:
+                users = load_file(self.users_file)
+                for email, user in users.items():
+                    if not os.path.exists(self.user_path(email)):
+                        dump_file({"email": email, "user": user}, self.user_path(email), self.serializer)
+                os.replace(self.users_file, self.users_file + ".migrated")
+                logger.info(f"users.json kullanıcı dosyalarına bölündü: {len(users)} kullanıcı")
+            except Exception as e:
+                logger.error(f"Kullanıcı dosyası aktarılırken hata: {str(e)}")
+
+    def load_user(self, email):
+        """Kullanıcıyı dosyasından okur; dosya değişmediyse bellekteki kopya kullanılır"""
+        path = self.user_path(email)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.forget_user(email)
+            return None
+        # Atomik yazma dosyayı değiştirdiği için inode her kayıtta yenilenir
+        signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if self.signatures.get(email) == signature:
+            return self.users[email]
+        try:
+            user = load_file(path)["user"]
+        except Exception as e:
+            logger.error(f"Kullanıcı dosyası yüklenirken hata: {str(e)}")
+            return None
+        self.users[email] = user
+        self.signatures[email] = signature
+        for project_id, project in user.get("projects", {}).items():
+            self.project_chats[(email, project_id)] = set(project.get("chats", []))
+        return user
+
+    def forget_user(self, email):
+        self.users.pop(email, None)
+        self.signatures.pop(email, None)
+        for key in [key for key in self.project_chats if key[0] == email]:
+            del self.project_chats[key]
+
+    def save_user(self, email):
+        """Yalnızca bu kullanıcının dosyasını yazar (çağıran kilidi tutmalı)"""
+        path = self.user_path(email)
+        dump_file({"email": email, "user": self.users[email]}, path, self.serializer)
+        stat = os.stat(path)
+        self.signatures[email] = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
     def load_users(self):
-        """Kullanıcı dosyasını yükler"""
-        if os.path.exists(self.users_file):
+        """Tüm kullanıcı dosyalarını yükler"""
+        for name in os.listdir(self.users_dir):
+            if not name.endswith(self.serializer.extension):
+                continue
             try:
-                with open(self.users_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                email = load_file(os.path.join(self.users_dir, name))["email"]
+                self.load_user(email)
             except Exception as e:
                 logger.error(f"Kullanıcı dosyası yüklenirken hata: {str(e)}")
-                return {}
-        return {}
-    
+        return self.users
+
     def save_users(self):
-        """Kullanıcı verilerini dosyaya kaydeder"""
+        """Yüklenmiş tüm kullanıcıların dosyalarını kaydeder"""
         try:
-            with open(self.users_file, 'w', encoding='utf-8') as f:
-                json.dump(self.users, f, indent=2, ensure_ascii=False)
+            for email in list(self.users):
+                with file_lock(self.user_path(email)):
+                    self.save_user(email)
             logger.info("Kullanıcı verileri kaydedildi")
         except Exception as e:
             logger.error(f"Kullanıcı verileri kaydedilirken hata: {str(e)}")
     
     def register_user(self, email, password):
         """Yeni kullanıcı kaydeder"""
-        if email in self.users:
-            logger.warning(f"Kullanıcı zaten kayıtlı: {email}")
-            return False, "Bu e-posta adresi zaten kayıtlı"
-        
+        with file_lock(self.user_path(email)):
+            if self.load_user(email) is not None:
+                logger.warning(f"Kullanıcı zaten kayıtlı: {email}")
+                return False, "Bu e-posta adresi zaten kayıtlı"
+            return self._create_user(email, password)
+
+    def _create_user(self, email, password):
+        """Kullanıcı kaydını oluşturup dosyasına yazar (çağıran kilidi tutmalı)"""
         # Şifre hashleme
         salt = os.urandom(16).hex()
         hashed_password = hashlib.sha256((password + salt).encode()).hexdigest()
@@ -65,17 +161,23 @@ class UserManager:
                 }
             }
         }
-        self.save_users()
+        self.project_chats[(email, "default")] = set()
+        try:
+            self.save_user(email)
+        except Exception as e:
+            self.forget_user(email)
+            logger.error(f"Kullanıcı kaydedilirken hata: {str(e)}")
+            return False, "Kullanıcı kaydedilemedi"
         logger.info(f"Yeni kullanıcı kaydedildi: {email}")
         return True, "Kayıt başarılı"
     
     def authenticate(self, email, password):
         """Kullanıcı girişini doğrular"""
-        if email not in self.users:
+        user = self.load_user(email)
+        if user is None:
             logger.warning(f"Kullanıcı bulunamadı: {email}")
             return False, "Kullanıcı bulunamadı"
         
-        user = self.users[email]
         hashed_password = hashlib.sha256((password + user['salt']).encode()).hexdigest()
         
         if hashed_password == user['password_hash']:
@@ -86,22 +188,33 @@ class UserManager:
     
     def get_user(self, email):
         """Belirli kullanıcıyı döndür"""
-        return self.users.get(email, None)
+        return self.load_user(email)
     
     def update_user(self, email, data):
         """Kullanıcı verilerini günceller"""
-        if email in self.users:
-            self.users[email].update(data)
-            self.save_users()
-            logger.info(f"Kullanıcı güncellendi: {email}")
-            return True
-        return False
+        with file_lock(self.user_path(email)):
+            # Başka bir örneğin yazdıkları kaybolmasın diye diskteki son hal üzerine uygulanır
+            user = self.load_user(email)
+            if user is None:
+                return False
+            user.update(data)
+            if "projects" in data:
+                for project_id, project in user["projects"].items():
+                    self.project_chats[(email, project_id)] = set(project.get("chats", []))
+            self.save_user(email)
+        logger.info(f"Kullanıcı güncellendi: {email}")
+        return True
     
     def add_chat_to_project(self, email, project_id, chat_id):
         """Projeye sohbet ID'si ekler"""
-        if email in self.users and project_id in self.users[email]['projects']:
-            if chat_id not in self.users[email]['projects'][project_id]['chats']:
-                self.users[email]['projects'][project_id]['chats'].append(chat_id)
-                self.save_users()
-                return True
-        return False
+        with file_lock(self.user_path(email)):
+            user = self.load_user(email)
+            if user is None or project_id not in user['projects']:
+                return False
+            members = self.project_chats.setdefault((email, project_id), set(user['projects'][project_id]['chats']))
+            if chat_id in members:
+                return False
+            members.add(chat_id)
+            user['projects'][project_id]['chats'].append(chat_id)
+            self.save_user(email)
+            return True
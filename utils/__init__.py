@@ -1,5 +1,6 @@
 from .error_dialog import ErrorDialog
 from .font_manager import apply_font_settings
+from .file_lock import file_lock
 from .helpers import (
     validate_email,
     get_available_fonts,
@@ -11,6 +12,7 @@ from .helpers import (
 __all__ = [
     'ErrorDialog',
     'apply_font_settings',
+    'file_lock',
     'validate_email',
     'get_available_fonts',
     'format_file_size',
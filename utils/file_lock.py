@@ -0,0 +1,32 @@
+import os
+from contextlib import contextmanager
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+@contextmanager
+def file_lock(path):
+    """path yanındaki .lock dosyası üzerinden süreçler arası özel kilit alır."""
+    with open(path + ".lock", "a+b") as f:
+        if os.name == "nt":
+            f.seek(0)
+            while True:
+                # LK_LOCK birkaç denemeden sonra vazgeçer; kilit alınana dek tekrarla
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+        else:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
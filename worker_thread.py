@@ -1,68 +1,367 @@
-import requests
+import json
 import time
+import queue
 import logging
+import threading
 from PyQt6.QtCore import QThread, pyqtSignal
+from http_client import get_client, TRANSPORT_ERRORS, OPENROUTER_BASE_URL
+from resilience import RetryPolicy, get_breaker
+from rate_limiter import get_rate_limiter
+from context_window import fit_to_context, max_reply_tokens
 
 logger = logging.getLogger('DeepSeekChat.worker')
 
+# Ağ beklenirken durdurma isteğinin yoklanma aralığı (sn)
+CANCEL_POLL_INTERVAL = 0.1
+
+
+def iter_sse_events(lines):
+    """Server-sent events akışındaki `data:` satırlarını JSON olarak döndürür"""
+    for line in lines:
+        if not line:
+            continue
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        # ":" ile başlayan satırlar yorumdur (ör. ": OPENROUTER PROCESSING")
+        if line.startswith(":") or not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            break
+        try:
+            yield json.loads(data)
+        except ValueError:
+            logger.warning(f"Geçersiz SSE verisi atlandı: {data[:80]}")
+
+
+class ApiError(Exception):
+    """Tekrar denenmeyecek API hatası (4xx, geçersiz yanıt)"""
+
+
+class RetryableError(ApiError):
+    """Aynı modelde tekrar denenebilecek geçici hata"""
+
+
+class RateLimitedError(RetryableError):
+    """429 yanıtı; bekleme süresi hız sınırlayıcıya bırakılır"""
+
+
+class CancelledError(Exception):
+    """Kullanıcı isteği durdurdu"""
+
+
 class WorkerThread(QThread):
     response_received = pyqtSignal(str, float)
     error_occurred = pyqtSignal(str)
     thinking_updated = pyqtSignal(str)  # Thinking messages signal
+    chunk_received = pyqtSignal(str)  # Streaming modunda gelen her parça
+    model_fallback = pyqtSignal(str, str)  # devresi açık model, yerine kullanılan model
+    rate_limited = pyqtSignal(int, float)  # hız sınırı sırasındaki yer, tahmini bekleme (sn)
+    cancelled = pyqtSignal(str)  # durdurulan yanıtın o ana kadar gelen kısmı
+    context_trimmed = pyqtSignal(int, int)  # bağlam dışında kalan mesaj sayısı, gönderilen token
 
-    def __init__(self, api_key, conversation_history, model="deepseek/deepseek-r1:free"):
+    def __init__(self, api_key, conversation_history, model="deepseek/deepseek-r1:free", stream=False,
+                 cache=None, use_cache=True, fallback_models=None, retry_policy=None):
         """Arka planda API isteği yapan iş parçacığı"""
         super().__init__()
         self.api_key = api_key
         self.conversation_history = conversation_history
         self.model = model
-        self.endpoint = "https://openrouter.ai/api/v1/chat/completions"
+        self.stream = stream
+        self.cache = cache
+        self.use_cache = use_cache
+        self.fallback_models = fallback_models or []
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limiter = get_rate_limiter()
+        self.endpoint = f"{OPENROUTER_BASE_URL}/chat/completions"
+        self.from_cache = False
+        self.used_model = model
+        self.first_token_time = None
+        self.cancel_event = threading.Event()
+        self.partial_parts = []
+
+    def cancel(self):
+        """İsteği durdurur; ağ bekleyen iş parçacığı en geç CANCEL_POLL_INTERVAL içinde çıkar.
+
+        Yanıt burada kapatılmaz: okuma sürerken close() okuyucunun kilidini bekler
+        ve çağıran (arayüz) iş parçacığını veri gelene kadar bloklar.
+        """
+        self.cancel_event.set()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def pause(self, seconds):
+        """Durdurulabilir bekleme (QThread.wait ile karışmaması için ayrı adla)"""
+        if self.cancel_event.wait(seconds):
+            raise CancelledError()
+
+    def call_cancellable(self, func, *args, **kwargs):
+        """Ağda bloklanan çağrıyı yardımcı iş parçacığında yapar; durdurulunca sonucunu beklemez"""
+        results = queue.Queue(maxsize=1)
+
+        def target():
+            try:
+                value = func(*args, **kwargs)
+            except BaseException as e:
+                results.put((False, e))
+                return
+            results.put((True, value))
+            if self.is_cancelled() and hasattr(value, "close"):
+                # Geç gelen yanıtı bekleyen kalmadı; bağlantı havuza bırakılır
+                value.close()
+
+        threading.Thread(target=target, name="worker-io", daemon=True).start()
+        while True:
+            try:
+                ok, value = results.get(timeout=CANCEL_POLL_INTERVAL)
+            except queue.Empty:
+                if self.is_cancelled():
+                    raise CancelledError()
+                continue
+            if ok:
+                return value
+            raise value
+
+    def iter_cancellable(self, lines, close):
+        """Akış satırlarını yardımcı iş parçacığında okur; veri beklenirken de durdurulabilir.
+
+        Akışı okuma bitince yardımcı iş parçacığı kendisi kapatır (close).
+        """
+        buffer = queue.Queue()
+        done = object()
+
+        def reader():
+            try:
+                for line in lines:
+                    buffer.put((line, None))
+                    if self.is_cancelled():
+                        break
+            except BaseException as e:
+                buffer.put((done, e))
+                return
+            finally:
+                try:
+                    close()
+                except Exception as e:
+                    logger.debug(f"Yanıt kapatılırken hata: {str(e)}")
+            buffer.put((done, None))
+
+        threading.Thread(target=reader, name="worker-sse", daemon=True).start()
+        while True:
+            try:
+                line, error = buffer.get(timeout=CANCEL_POLL_INTERVAL)
+            except queue.Empty:
+                if self.is_cancelled():
+                    raise CancelledError()
+                continue
+            if line is done:
+                if error is not None:
+                    raise error
+                return
+            yield line
+
+    def build_payload(self, model):
+        """Modelin bağlam bütçesine göre kırpılmış istek gövdesini oluşturur"""
+        max_tokens = max_reply_tokens(model)
+        messages, self.dropped_messages, self.context_tokens = fit_to_context(
+            self.conversation_history, model, max_tokens
+        )
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": 0.7,
+            "max_tokens": max_tokens,
+        }
+        if self.stream:
+            payload["stream"] = True
+        return payload
 
     def run(self):
         """API isteğini çalıştır ve sonuçları sinyallerle döndür"""
         try:
-            headers = {
-                "Authorization": f"Bearer {self.api_key}",
-                "Content-Type": "application/json",
-                "HTTP-Referer": "https://github.com/CxReiS/DeepSeekChat",
-                "X-Title": "DeepSeek Chat",
-            }
-
-            payload = {
-                "model": self.model,
-                "messages": self.conversation_history,
-                "temperature": 0.7,
-                "max_tokens": 4096,
-            }
-            
             start_time = time.time()
 
+            # Aynı istek daha önce yanıtlandıysa ağa çıkmadan döndür
+            if self.cache is not None:
+                cache_key = self.cache.make_key(self.build_payload(self.model))
+                cached_reply = self.cache.get(cache_key) if self.use_cache else None
+                if cached_reply is not None:
+                    self.from_cache = True
+                    if self.stream:
+                        self.chunk_received.emit(cached_reply)
+                    self.response_received.emit(cached_reply, time.time() - start_time)
+                    return
+
             # Düşünme adımları
             thinking_steps = [
                 "🤔 Sorunuzu analiz ediyorum...",
                 "🔍 Bilgilerimi tarıyorum...",
                 "🧠 En iyi cevabı oluşturuyorum..."
             ]
-            for step in thinking_steps:
-                self.thinking_updated.emit(step)
-                time.sleep(0.8)  # Simulate thinking time
-
-            response = requests.post(self.endpoint, json=payload, headers=headers, timeout=120)
-            response_time = time.time() - start_time
-                     
-            if response.status_code == 200:
-                response_data = response.json()
-                if 'choices' in response_data and len(response_data['choices']) > 0:
-                    assistant_message = response_data['choices'][0]['message']['content']
-                    self.response_received.emit(assistant_message, response_time)
-                else:
-                    self.error_occurred.emit("API yanıtı geçersiz: choices bulunamadı")
+            if self.stream:
+                # Streaming modunda ilk token'ı geciktirmemek için bekleme yapılmaz
+                self.thinking_updated.emit(thinking_steps[0])
             else:
-                error_msg = f"API hatası ({response.status_code}): {response.text}"
-                self.error_occurred.emit(error_msg)
-                
-        except requests.exceptions.RequestException as e:
-            self.error_occurred.emit(f"Ağ hatası: {str(e)}")
+                for step in thinking_steps:
+                    self.thinking_updated.emit(step)
+                    self.pause(0.8)  # Simulate thinking time
+
+            # Devresi açık modeller atlanır, model_mapping sırasındaki sonraki modele geçilir
+            last_error = "Kullanılabilir model bulunamadı"
+            for model in [self.model] + self.fallback_models:
+                breaker = get_breaker(model)
+                if not breaker.allow_request():
+                    logger.warning(f"Devre açık, model atlanıyor: {model}")
+                    continue
+                if model != self.model:
+                    self.model_fallback.emit(self.model, model)
+
+                # Her model kendi yanıtını baştan kurar; iki modelin çıktısı birleştirilmez
+                self.partial_parts = []
+                result = self.request_with_retries(model, breaker, start_time)
+                if result is None:
+                    return
+                last_error = result
+                if self.first_token_time is not None:
+                    # Akış yarıda kesildi; başka modelle devam etmek farklı bir yanıtı sona ekler
+                    logger.warning(f"Akış yarıda kesildi, yedek modele geçilmiyor ({model})")
+                    self.error_occurred.emit(f"Yanıt yarıda kesildi: {result}")
+                    return
+
+            self.error_occurred.emit(last_error)
+
+        except CancelledError:
+            partial = "".join(self.partial_parts)
+            logger.info(f"İstek durduruldu ({self.used_model}, {len(partial)} karakter alındı)")
+            self.cancelled.emit(partial)
         except Exception as e:
             self.error_occurred.emit(f"Beklenmeyen hata: {str(e)}")
-            self.response_received.emit("Üzgünüm, bir hata oluştu. Lütfen bağlantınızı kontrol edin.", 0)    
+            self.response_received.emit("Üzgünüm, bir hata oluştu. Lütfen bağlantınızı kontrol edin.", 0)
+
+    def request_with_retries(self, model, breaker, start_time):
+        """Modeli geçici hatalarda tekrar dener; başarıda None, aksi halde hata mesajı döner"""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+            "HTTP-Referer": "https://github.com/CxReiS/DeepSeekChat",
+            "X-Title": "DeepSeek Chat",
+        }
+        payload = self.build_payload(model)
+        if self.dropped_messages:
+            self.context_trimmed.emit(self.dropped_messages, self.context_tokens)
+        error_msg = None
+        retry_delay = 0
+
+        for attempt in range(self.retry_policy.max_retries + 1):
+            if retry_delay:
+                self.thinking_updated.emit(
+                    f"🔁 Yeniden deneniyor ({attempt}/{self.retry_policy.max_retries}, {retry_delay:.1f} sn)..."
+                )
+                self.pause(retry_delay)
+            self.wait_for_rate_limit(model)
+            try:
+                self.send_request(model, payload, headers, start_time)
+                breaker.record_success()
+                return None
+            except RateLimitedError as e:
+                # Hız sınırı modelin arızası sayılmaz; bekleme bir sonraki turda yapılır
+                error_msg = str(e)
+                retry_delay = 0
+                continue
+            except RetryableError as e:
+                error_msg = str(e)
+            except TRANSPORT_ERRORS as e:
+                error_msg = f"Ağ hatası: {str(e)}"
+            except ApiError as e:
+                # Kalıcı hata (4xx, geçersiz yanıt): tekrar denenmez
+                breaker.record_success()
+                self.error_occurred.emit(str(e))
+                return None
+
+            breaker.record_failure()
+            logger.warning(f"İstek başarısız ({model}, deneme {attempt + 1}): {error_msg}")
+            if breaker.is_open() or self.first_token_time is not None:
+                # Akış başladıktan sonra tekrar denemek yanıtı çoğaltır
+                break
+            retry_delay = self.retry_policy.delay(attempt)
+        return error_msg
+
+    def wait_for_rate_limit(self, model):
+        """Hız sınırı izin verene kadar bekler, sıradaki yeri bildirir"""
+        wait, position = self.rate_limiter.acquire(self.api_key, model)
+        if wait > 0:
+            logger.info(f"Hız sınırı: {model} için {wait:.1f} sn bekleniyor (sıra {position})")
+            self.rate_limited.emit(position, wait)
+            self.pause(wait)
+
+    def send_request(self, model, payload, headers, start_time):
+        """Tek bir HTTP isteği gönderir ve yanıtı sinyallerle iletir"""
+        if self.is_cancelled():
+            raise CancelledError()
+        response = self.call_cancellable(
+            get_client().post, self.endpoint, json=payload, headers=headers, timeout=120, stream=self.stream
+        )
+        if self.is_cancelled():
+            # Başlıklar beklenirken durdurulduysa bağlantı burada bırakılır
+            response.close()
+            raise CancelledError()
+        self.rate_limiter.feedback(self.api_key, model, response.status_code, response.headers)
+        if response.status_code != 200:
+            error_msg = f"API hatası ({response.status_code}): {response.text}"
+            response.close()
+            if response.status_code == 429:
+                raise RateLimitedError(error_msg)
+            if self.retry_policy.is_retryable(response.status_code):
+                raise RetryableError(error_msg)
+            raise ApiError(error_msg)
+
+        self.used_model = model
+        if self.stream:
+            self.read_stream(response, start_time)
+            return
+
+        response_data = response.json()
+        if 'choices' in response_data and len(response_data['choices']) > 0:
+            assistant_message = response_data['choices'][0]['message']['content']
+            self.store_in_cache(assistant_message)
+            self.response_received.emit(assistant_message, time.time() - start_time)
+        else:
+            raise ApiError("API yanıtı geçersiz: choices bulunamadı")
+
+    def read_stream(self, response, start_time):
+        """SSE akışını parça parça okuyup chunk_received ile iletir"""
+        parts = self.partial_parts
+        try:
+            lines = self.iter_cancellable(response.iter_lines(decode_unicode=True), response.close)
+            for event in iter_sse_events(lines):
+                if self.is_cancelled():
+                    raise CancelledError()
+                if "error" in event:
+                    message = event["error"].get("message", "Bilinmeyen hata")
+                    raise RetryableError(f"API hatası (stream): {message}")
+                choices = event.get("choices") or []
+                if not choices:
+                    continue
+                content = (choices[0].get("delta") or {}).get("content")
+                if content:
+                    if self.first_token_time is None:
+                        self.first_token_time = time.time() - start_time
+                        logger.info(f"İlk token süresi: {self.first_token_time:.2f} sn ({self.used_model})")
+                    parts.append(content)
+                    self.chunk_received.emit(content)
+        finally:
+            # Durdurulduysa okuyucu hâlâ veri bekliyor olabilir; akışı o kapatır
+            if not self.is_cancelled():
+                response.close()
+
+        if not parts:
+            raise RetryableError("API yanıtı geçersiz: akışta içerik bulunamadı")
+        reply = "".join(parts)
+        self.store_in_cache(reply)
+        self.response_received.emit(reply, time.time() - start_time)
+
+    def store_in_cache(self, reply):
+        """Başarılı yanıtı, yanıtı veren modelin anahtarıyla önbelleğe yazar"""
+        if self.cache is not None:
+            self.cache.put(self.cache.make_key(self.build_payload(self.used_model)), reply)